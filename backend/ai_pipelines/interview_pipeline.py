@@ -1,3 +1,6 @@
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
 from services.groq_service import GroqService
 from services.gemini_service import GeminiService
 from services.langchain_service import LangChainService
@@ -9,6 +12,14 @@ class InterviewPipeline:
         self.gemini = GeminiService()
         self.langchain = LangChainService()
 
+        # Bounded pool for LLM calls a request runs side by side
+        self.executor = ThreadPoolExecutor(
+            max_workers=int(os.getenv('INTERVIEW_LLM_WORKERS', 16)),
+            thread_name_prefix='interview-llm'
+        )
+        self.llm_timeout = float(os.getenv('INTERVIEW_LLM_TIMEOUT_SECONDS', 20))
+        self.evaluation_batch_size = int(os.getenv('INTERVIEW_EVALUATION_BATCH_SIZE', 5))
+
         # Question banks by round type
         self.question_templates = {
             'hr': [
@@ -73,49 +84,7 @@ class InterviewPipeline:
     def generate_questions(self, round_type='technical', company='general', topic='', count=5, persona='strict_senior'):
         """Generate interview questions based on parameters"""
         try:
-            # Build prompt for AI generation
-            prompt = f"""Generate {count} interview questions for a {round_type} round.
-            Company: {company}
-            {'Topic focus: ' + topic if topic else ''}
-
-            Requirements:
-            - Questions should be realistic and commonly asked
-            - Progress from basic to challenging
-            - For technical: include follow-up points
-            - For behavioral: use STAR format triggers
-
-            Format each question as:
-            Q[number]: [Question text]
-            Focus: [Key points interviewer looks for]
-
-            Generate exactly {count} questions."""
-
-            response = self.groq.fast_generate(prompt, max_tokens=1500)
-
-            # Parse questions
-            questions = []
-            lines = response.split('\n')
-            current_q = None
-            current_focus = None
-
-            for line in lines:
-                line = line.strip()
-                if line.startswith('Q') and ':' in line:
-                    if current_q:
-                        questions.append({
-                            'text': current_q,
-                            'focus': current_focus or ''
-                        })
-                    current_q = line.split(':', 1)[1].strip()
-                    current_focus = None
-                elif 'Focus:' in line:
-                    current_focus = line.split(':', 1)[1].strip()
-
-            if current_q:
-                questions.append({
-                    'text': current_q,
-                    'focus': current_focus or ''
-                })
+            questions = self.generate_question_set(round_type, company, topic, count, cache=True)
 
             # Ensure we have enough questions
             while len(questions) < count:
@@ -135,6 +104,54 @@ class InterviewPipeline:
             templates = self.question_templates.get(round_type, self.question_templates['technical'])
             return [{'text': self._format_template(q, topic, company), 'focus': ''} for q in templates[:count]]
 
+    def generate_question_set(self, round_type='technical', company='general', topic='', count=5, cache=False):
+        """Generate questions with the LLM only; may return fewer than count and raises on errors"""
+        # Build prompt for AI generation
+        prompt = f"""Generate {count} interview questions for a {round_type} round.
+        Company: {company}
+        {'Topic focus: ' + topic if topic else ''}
+
+        Requirements:
+        - Questions should be realistic and commonly asked
+        - Progress from basic to challenging
+        - For technical: include follow-up points
+        - For behavioral: use STAR format triggers
+
+        Format each question as:
+        Q[number]: [Question text]
+        Focus: [Key points interviewer looks for]
+
+        Generate exactly {count} questions."""
+
+        response = self.groq.fast_generate(prompt, max_tokens=1500, cache=cache)
+
+        # Parse questions
+        questions = []
+        lines = response.split('\n')
+        current_q = None
+        current_focus = None
+
+        for line in lines:
+            line = line.strip()
+            if line.startswith('Q') and ':' in line:
+                if current_q:
+                    questions.append({
+                        'text': current_q,
+                        'focus': current_focus or ''
+                    })
+                current_q = line.split(':', 1)[1].strip()
+                current_focus = None
+            elif 'Focus:' in line:
+                current_focus = line.split(':', 1)[1].strip()
+
+        if current_q:
+            questions.append({
+                'text': current_q,
+                'focus': current_focus or ''
+            })
+
+        return questions[:count]
+
     def _format_template(self, template, topic='', company='general'):
         """Format question template with actual values"""
         # Get a random topic if not specified
@@ -169,18 +186,7 @@ class InterviewPipeline:
             return evaluation
         except Exception as e:
             # Return default scores on error
-            return {
-                'scores': {
-                    'technical_correctness': 60,
-                    'communication_skills': 60,
-                    'answer_structure': 60,
-                    'reasoning_depth': 60,
-                    'completeness': 60,
-                    'overall': 60
-                },
-                'feedback': 'Unable to evaluate. Please try again.',
-                'suggestions': ['Continue practicing']
-            }
+            return self._default_evaluation()
 
     def generate_follow_up(self, question, answer, evaluation=None):
         """Generate follow-up questions based on the answer"""
@@ -188,10 +194,72 @@ class InterviewPipeline:
             follow_ups = self.groq.generate_follow_up(question, answer)
             return follow_ups
         except Exception as e:
-            return [
-                "Can you explain that in more detail?",
-                "What would be an alternative approach?"
-            ]
+            return self._default_follow_ups()
+
+    def evaluate_with_follow_up(self, question, answer, round_type='technical'):
+        """Evaluate an answer and generate follow-ups concurrently, returning (evaluation, follow_ups)"""
+        # Follow-ups are generated from the question and answer alone, so neither call waits on the other
+        evaluation = self.executor.submit(self.evaluate_answer, question, answer, round_type)
+        follow_ups = self.executor.submit(self.generate_follow_up, question, answer)
+
+        deadline = time.monotonic() + self.llm_timeout
+        return (
+            self._result_by(deadline, evaluation, self._default_evaluation, 'Evaluation'),
+            self._result_by(deadline, follow_ups, self._default_follow_ups, 'Follow-up generation')
+        )
+
+    def evaluate_answers(self, items, round_type='technical'):
+        """Evaluate (question, answer) pairs in a few batched requests, one evaluation per pair"""
+        size = self.evaluation_batch_size
+        chunks = [items[i:i + size] for i in range(0, len(items), size)]
+        futures = [self.executor.submit(self.groq.evaluate_answers, chunk) for chunk in chunks]
+
+        evaluations = []
+        for chunk, future in zip(chunks, futures):
+            try:
+                evaluations.extend(future.result())
+            except Exception as e:
+                print(f"Batch evaluation error: {e}")
+                evaluations.extend([None] * len(chunk))
+
+        # Answers the batch response skipped are evaluated on their own, concurrently
+        fallbacks = {
+            i: self.executor.submit(self.evaluate_answer, question, answer, round_type)
+            for i, ((question, answer), evaluation) in enumerate(zip(items, evaluations))
+            if evaluation is None
+        }
+        return [
+            fallbacks[i].result() if i in fallbacks else evaluation
+            for i, evaluation in enumerate(evaluations)
+        ]
+
+    def _result_by(self, deadline, future, fallback, label):
+        try:
+            return future.result(timeout=max(0, deadline - time.monotonic()))
+        except TimeoutError:
+            future.cancel()
+            print(f"{label} timed out after {self.llm_timeout}s")
+            return fallback()
+
+    def _default_evaluation(self):
+        return {
+            'scores': {
+                'technical_correctness': 60,
+                'communication_skills': 60,
+                'answer_structure': 60,
+                'reasoning_depth': 60,
+                'completeness': 60,
+                'overall': 60
+            },
+            'feedback': 'Unable to evaluate. Please try again.',
+            'suggestions': ['Continue practicing']
+        }
+
+    def _default_follow_ups(self):
+        return [
+            "Can you explain that in more detail?",
+            "What would be an alternative approach?"
+        ]
 
     def analyze_communication(self, transcription):
         """Analyze communication patterns and provide tips"""
@@ -4,6 +4,8 @@ from flask_jwt_extended import JWTManager
 from pymongo import MongoClient
 from dotenv import load_dotenv
 import os
+import atexit
+import threading
 
 # Load environment variables
 load_dotenv()
@@ -27,6 +29,29 @@ db = client.get_database()
 # Make db available to routes
 app.config['db'] = db
 
+# Proctoring events are buffered per worker and bulk-flushed to MongoDB
+from services.proctoring_log import ProctoringEventBuffer
+
+proctoring_event_buffer = ProctoringEventBuffer(db.proctoring_logs)
+app.config['proctoring_event_buffer'] = proctoring_event_buffer
+atexit.register(proctoring_event_buffer.close)
+
+# Groq and LangChain clients share one keep-alive connection pool per worker
+from services.llm_clients import llm_clients
+
+atexit.register(llm_clients.close)
+
+# Opted-in LLM responses are cached per worker and shared through MongoDB
+from services.llm_cache import llm_cache
+from services.singleflight import llm_requests
+
+llm_cache.attach(db.llm_cache)
+
+# Uploaded answer clips are shared by workers so an audio_id resolves on any of them
+from services.audio_features import audio_clips
+
+audio_clips.attach(db.audio_clips)
+
 # Import and register blueprints
 from routes.auth import auth_bp
 from routes.interview import interview_bp
@@ -48,9 +73,31 @@ app.register_blueprint(reports_bp, url_prefix='/api/reports')
 app.register_blueprint(gd_bp, url_prefix='/api/gd')
 app.register_blueprint(resume_bp, url_prefix='/api/resume')
 
+# Warm proctoring models in the background as each worker boots
+from routes.proctoring import proctoring_service
+
+if os.getenv('PROCTORING_WARMUP', 'true').lower() == 'true':
+    threading.Thread(target=proctoring_service.warm_up, daemon=True).start()
+else:
+    # Models load lazily on first use, so the worker can serve right away
+    proctoring_service.ready = True
+
+# Interview question sets are pooled in MongoDB and topped up in the background
+from routes.interview import question_pool, prewarm_question_pool
+
+question_pool.attach(db.question_pool)
+if os.getenv('QUESTION_POOL_PREWARM', 'true').lower() == 'true':
+    prewarm_question_pool()
+
 @app.route('/api/health', methods=['GET'])
 def health_check():
-    return jsonify({'status': 'healthy', 'message': 'AI Interview Platform API is running'})
+    return jsonify({
+        'status': 'healthy',
+        'message': 'AI Interview Platform API is running',
+        'proctoring': proctoring_service.status(),
+        'llm_cache': llm_cache.stats(),
+        'llm_requests': llm_requests.stats()
+    })
 
 @app.errorhandler(404)
 def not_found(error):
@@ -0,0 +1,128 @@
+"""
+Compare phone detector backends on latency and recall.
+
+Expects an image directory with two labelled subfolders:
+
+    images/phone/      frames that contain a phone
+    images/no_phone/   frames that do not
+
+Usage (from backend/):
+
+    python -m benchmarks.phone_detector_benchmark --images images/ \
+        --backend onnx --model yolov8s.int8.onnx --imgsz 416
+
+Pass --int8 with --calibration-images <dir> to export and quantize the
+candidate; calibration frames should not overlap the measured images.
+
+The candidate backend is compared against the current ultralytics
+yolov8s.pt path at 640px.
+"""
+import argparse
+import os
+import time
+
+import cv2
+import numpy as np
+
+from services.phone_detector import create_phone_detector, export_phone_detector
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.bmp', '.webp')
+
+
+def load_images(folder):
+    """Load every image in a folder as a BGR frame"""
+    if not os.path.isdir(folder):
+        return []
+    frames = []
+    for name in sorted(os.listdir(folder)):
+        if name.lower().endswith(IMAGE_EXTENSIONS):
+            frame = cv2.imread(os.path.join(folder, name))
+            if frame is not None:
+                frames.append(frame)
+    return frames
+
+
+def run_detector(detector, frames, batch_size, warmup=3):
+    """Return (flags, per-frame latencies in ms) for a detector over frames"""
+    for _ in range(warmup):
+        detector.detect(frames[:batch_size])
+
+    flags, latencies = [], []
+    for start in range(0, len(frames), batch_size):
+        batch = frames[start:start + batch_size]
+        began = time.perf_counter()
+        flags.extend(detector.detect(batch))
+        latencies.append((time.perf_counter() - began) * 1000 / len(batch))
+    return flags, latencies
+
+
+def report(name, flags, latencies, labels):
+    """Print latency and detection quality for one backend"""
+    flags, labels = np.array(flags), np.array(labels)
+    positives = labels.sum()
+    negatives = len(labels) - positives
+    recall = (flags & labels).sum() / positives if positives else float('nan')
+    false_positive_rate = (flags & ~labels).sum() / negatives if negatives else float('nan')
+
+    print(f"{name:<40} mean {np.mean(latencies):7.1f} ms/frame   "
+          f"p95 {np.percentile(latencies, 95):7.1f} ms/frame   "
+          f"recall {recall:6.1%}   false positives {false_positive_rate:6.1%}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--images', required=True, help='Folder with phone/ and no_phone/ subfolders')
+    parser.add_argument('--backend', default='onnx', choices=['ultralytics', 'onnx', 'openvino'])
+    parser.add_argument('--model', help='Candidate model path (exported from yolov8s.pt if omitted)')
+    parser.add_argument('--imgsz', type=int, default=640, help='Candidate input size')
+    parser.add_argument('--int8', action='store_true', help='Quantize the exported candidate to int8')
+    parser.add_argument('--calibration-images', help='Folder of frames used to calibrate --int8, kept apart from --images')
+    parser.add_argument('--batch-size', type=int, default=8)
+    args = parser.parse_args()
+
+    if args.int8 and args.backend == 'ultralytics':
+        parser.error('--int8 needs an exported backend (onnx or openvino)')
+    if args.int8 and args.model:
+        parser.error('--int8 only applies to an exported candidate; drop --model or pass an already quantized model')
+    if args.int8 and not args.calibration_images:
+        parser.error('--int8 needs --calibration-images separate from --images')
+
+    phone_frames = load_images(os.path.join(args.images, 'phone'))
+    clear_frames = load_images(os.path.join(args.images, 'no_phone'))
+    frames = phone_frames + clear_frames
+    labels = [True] * len(phone_frames) + [False] * len(clear_frames)
+
+    if not frames:
+        parser.error('No images found under phone/ or no_phone/')
+
+    calibration_frames = None
+    if args.int8:
+        calibration_frames = load_images(args.calibration_images)
+        if not calibration_frames:
+            parser.error(f'No images found in {args.calibration_images}')
+
+    model_path = args.model
+    if not model_path and args.backend != 'ultralytics':
+        model_path = export_phone_detector(
+            'yolov8s.pt', imgsz=args.imgsz, backend=args.backend, int8=args.int8,
+            calibration_frames=calibration_frames
+        )
+
+    baseline = create_phone_detector('ultralytics', 'yolov8s.pt', 640)
+    candidate = create_phone_detector(args.backend, model_path, args.imgsz)
+
+    print(f"{len(phone_frames)} phone / {len(clear_frames)} no-phone images, batch size {args.batch_size}\n")
+
+    baseline_flags, baseline_latencies = run_detector(baseline, frames, args.batch_size)
+    report('ultralytics yolov8s.pt @640 (baseline)', baseline_flags, baseline_latencies, labels)
+
+    candidate_flags, candidate_latencies = run_detector(candidate, frames, args.batch_size)
+    report(f'{args.backend} {os.path.basename(str(model_path or "yolov8s.pt"))} @{args.imgsz}',
+           candidate_flags, candidate_latencies, labels)
+
+    agreement = np.mean(np.array(baseline_flags) == np.array(candidate_flags))
+    print(f"\nAgreement with baseline: {agreement:.1%}")
+
+
+if __name__ == '__main__':
+    main()
@@ -3,6 +3,7 @@ from flask_jwt_extended import jwt_required, get_jwt_identity
 from datetime import datetime, timedelta
 from bson import ObjectId
 from services.langchain_service import LangChainService
+from services.proctoring_log import summarize_log
 
 analytics_bp = Blueprint('analytics', __name__)
 langchain_service = LangChainService()
@@ -169,9 +170,10 @@ def calculate_placement_readiness_score(db, user_id):
     }))
 
     # Get proctoring data
-    proctoring_logs = list(db.proctoring_logs.find({
-        'user_id': ObjectId(user_id)
-    }))
+    proctoring_logs = list(db.proctoring_logs.find(
+        {'user_id': ObjectId(user_id)},
+        {'summary': 1}
+    ))
 
     if not interviews and not quizzes:
         return {
@@ -209,7 +211,7 @@ def calculate_placement_readiness_score(db, user_id):
         technical_score = (technical_score + quiz_avg) / 2 if interviews else quiz_avg
 
     if proctoring_logs:
-        integrity_scores = [log.get('summary', {}).get('integrity_score', 100) for log in proctoring_logs]
+        integrity_scores = [summarize_log(log)['integrity_score'] for log in proctoring_logs]
         integrity_score = sum(integrity_scores) / len(integrity_scores)
 
     # Calculate overall score with weights
@@ -3,6 +3,8 @@ from flask_jwt_extended import jwt_required, get_jwt_identity
 from datetime import datetime
 from bson import ObjectId
 from services.gemini_service import GeminiService
+from services.chunked_generation import generate_in_chunks, valid_count, MAX_GENERATION_COUNT
+from services.flashcard_library import FlashcardLibrary, FLASHCARD_LIBRARY_BATCH_SIZE, card_reference
 
 flashcards_bp = Blueprint('flashcards', __name__)
 gemini_service = GeminiService()
@@ -32,27 +34,31 @@ def generate_flashcards():
     if subject not in SUBJECTS:
         return jsonify({'error': 'Invalid subject'}), 400
 
-    try:
-        # Generate flashcards using Gemini
-        prompt = f"""Generate {count} flashcards for {subject} - {topic}.
-        Difficulty level: {difficulty}
+    if not valid_count(count):
+        return jsonify({'error': f'count must be an integer from 1 to {MAX_GENERATION_COUNT}'}), 400
 
-        Format each flashcard as:
-        Q: [Question]
-        A: [Concise but complete answer]
+    try:
+        # Draw cards from the shared library; Gemini only fills gaps
+        library = FlashcardLibrary(db.flashcard_library)
+        library_cards = library.sample(subject, topic, difficulty, count)
 
-        Make questions progressively more challenging.
-        Include practical examples where applicable."""
+        if len(library_cards) < count:
+            generated = generate_flashcard_cards(
+                subject, topic, difficulty, max(count - len(library_cards), FLASHCARD_LIBRARY_BATCH_SIZE)
+            )
+            library.add(subject, topic, difficulty, generated)
+            library_cards = library.sample(subject, topic, difficulty, count)
 
-        response = gemini_service.generate_content(prompt)
-        cards = parse_flashcards(response, count)
+        # The user's set only references library cards and tracks its own review state
+        card_refs = [card_reference(card_id, card) for card_id, card in enumerate(library_cards)]
 
         # Create flashcard document
         flashcard_doc = {
             'user_id': ObjectId(user_id),
             'subject': subject,
             'topic': topic,
-            'cards': cards,
+            'difficulty': difficulty,
+            'cards': card_refs,
             'created_at': datetime.utcnow(),
             'updated_at': datetime.utcnow()
         }
@@ -61,7 +67,11 @@ def generate_flashcards():
 
         return jsonify({
             'flashcard_id': str(result.inserted_id),
-            'cards': cards,
+            # The sampled library cards already hold the text, so no hydrate query is needed
+            'cards': [
+                {**ref, 'question': card['question'], 'answer': card['answer']}
+                for ref, card in zip(card_refs, library_cards)
+            ],
             'subject': subject,
             'topic': topic
         }), 201
@@ -70,6 +80,31 @@ def generate_flashcards():
         return jsonify({'error': str(e)}), 500
 
 
+def generate_flashcard_cards(subject, topic, difficulty, count):
+    """Generate and parse flashcards for the shared library, in parallel chunks for large counts"""
+    def generate_chunk(chunk_count, focus):
+        # Generate flashcards using Gemini
+        prompt = f"""Generate {chunk_count} flashcards for {subject} - {topic}.
+        Difficulty level: {difficulty}
+        {f'Focus on: {focus}' if focus else ''}
+
+        Format each flashcard as:
+        Q: [Question]
+        A: [Concise but complete answer]
+
+        Make questions progressively more challenging.
+        Include practical examples where applicable."""
+
+        # Not cached: the library keeps every parsed card, and gaps need new ones
+        response = gemini_service.generate_content(prompt)
+        return parse_flashcards(response, chunk_count)
+
+    cards = generate_in_chunks(generate_chunk, count, lambda card: card['question'])
+    for card_id, card in enumerate(cards):
+        card['card_id'] = card_id
+    return cards
+
+
 def parse_flashcards(response, count):
     """Parse AI response into flashcard format"""
     cards = []
@@ -150,6 +185,7 @@ def get_flashcard_set(flashcard_id):
     if not flashcard:
         return jsonify({'error': 'Flashcard set not found'}), 404
 
+    flashcard['cards'] = FlashcardLibrary(db.flashcard_library).hydrate(flashcard.get('cards', []))
     flashcard['_id'] = str(flashcard['_id'])
     flashcard['user_id'] = str(flashcard['user_id'])
     if flashcard.get('created_at'):
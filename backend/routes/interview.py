@@ -2,11 +2,15 @@ from flask import Blueprint, request, jsonify, current_app
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from datetime import datetime
 from bson import ObjectId
+from concurrent.futures import Future, ThreadPoolExecutor
 import os
 
 # Import AI services
 from services.groq_service import GroqService
 from services.langchain_service import LangChainService
+from services.audio_features import audio_clips
+from services.question_pool import QuestionPool
+from routes.proctoring import proctoring_service, proctoring_session_id
 from ai_pipelines.interview_pipeline import InterviewPipeline
 
 interview_bp = Blueprint('interview', __name__)
@@ -16,6 +20,12 @@ groq_service = GroqService()
 langchain_service = LangChainService()
 interview_pipeline = InterviewPipeline()
 
+# Runs voice analysis alongside transcription for /answer
+answer_executor = ThreadPoolExecutor(
+    max_workers=int(os.getenv('INTERVIEW_ANSWER_WORKERS', 8)),
+    thread_name_prefix='interview-answer'
+)
+
 # Company-specific configurations
 COMPANY_CONFIGS = {
     'amazon': {
@@ -50,6 +60,10 @@ COMPANY_CONFIGS = {
     }
 }
 
+# per_answer evaluates each answer as it is submitted; deferred only stores
+# answers and evaluates them all in batched requests at /complete
+EVALUATION_MODES = ('per_answer', 'deferred')
+
 # Interview personas
 PERSONAS = {
     'strict_senior': {
@@ -75,6 +89,23 @@ PERSONAS = {
 }
 
 
+# Ready-made question sets for /start, generated in the background for every known
+# company and 'general' in each round type; anything else is generated on the spot
+question_pool = QuestionPool(
+    interview_pipeline.generate_question_set,
+    keys=[
+        (round_type, company, '')
+        for company in [*COMPANY_CONFIGS, 'general']
+        for round_type in interview_pipeline.question_templates
+    ]
+)
+
+
+def prewarm_question_pool():
+    """Queue question sets for every pooled company and round type"""
+    question_pool.prewarm()
+
+
 @interview_bp.route('/start', methods=['POST'])
 @jwt_required()
 def start_interview():
@@ -86,14 +117,20 @@ def start_interview():
     round_type = data.get('round_type', 'technical')
     company = data.get('company', 'general')
     persona = data.get('persona', 'strict_senior')
-
-    # Generate initial questions based on configuration
-    questions = interview_pipeline.generate_questions(
-        round_type=round_type,
-        company=company,
-        persona=persona,
-        count=5
-    )
+    evaluation_mode = data.get('evaluation_mode', 'per_answer')
+
+    if evaluation_mode not in EVALUATION_MODES:
+        return jsonify({'error': f'evaluation_mode must be one of {", ".join(EVALUATION_MODES)}'}), 400
+
+    # Serve a pre-generated set when the pool has one; generate on the spot otherwise
+    questions = question_pool.take(round_type, company, count=5)
+    if questions is None:
+        questions = interview_pipeline.generate_questions(
+            round_type=round_type,
+            company=company,
+            persona=persona,
+            count=5
+        )
 
     # Create interview document
     interview = {
@@ -101,6 +138,7 @@ def start_interview():
         'company': company,
         'round_type': round_type,
         'persona': persona,
+        'evaluation_mode': evaluation_mode,
         'questions': [],
         'overall_scores': {
             'technical': 0.0,
@@ -143,14 +181,16 @@ def transcribe_audio():
     if 'audio' not in request.files:
         return jsonify({'error': 'No audio file provided'}), 400
 
-    audio_file = request.files['audio']
+    # Cached so voice and noise analysis can reuse the clip by audio_id
+    clip = audio_clips.ingest(request.files['audio'])
 
     try:
         # Transcribe using Groq Whisper
-        transcription = groq_service.transcribe_audio(audio_file)
+        transcription = groq_service.transcribe_audio(clip)
 
         return jsonify({
             'transcription': transcription,
+            'audio_id': clip.audio_id,
             'success': True
         }), 200
     except Exception as e:
@@ -175,46 +215,121 @@ def evaluate_answer():
         return jsonify({'error': 'Missing required fields'}), 400
 
     try:
-        # Evaluate answer using AI pipeline
-        evaluation = interview_pipeline.evaluate_answer(
-            question=question_text,
-            answer=user_answer,
-            round_type=round_type
+        result = evaluate_and_store_answer(
+            db, interview_id, question_id, question_text, user_answer, round_type,
+            deferred=is_deferred(db, interview_id)
         )
+        return jsonify(result), 200
 
-        # Generate follow-up questions
-        follow_ups = interview_pipeline.generate_follow_up(
-            question=question_text,
-            answer=user_answer,
-            evaluation=evaluation
-        )
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
 
-        # Store in database
-        question_data = {
-            'question_id': question_id,
-            'question_text': question_text,
-            'user_answer': user_answer,
-            'transcription_raw': user_answer,
-            'follow_up_questions': follow_ups,
-            'scores': evaluation['scores'],
-            'ai_feedback': evaluation['feedback'],
-            'timestamp': datetime.utcnow()
-        }
 
-        db.interviews.update_one(
-            {'_id': ObjectId(interview_id)},
-            {'$push': {'questions': question_data}}
+@interview_bp.route('/answer', methods=['POST'])
+@jwt_required()
+def submit_answer():
+    """Transcribe, voice-analyze and evaluate a spoken answer in one call"""
+    db = current_app.config['db']
+
+    if 'audio' not in request.files:
+        return jsonify({'error': 'No audio file provided'}), 400
+
+    interview_id = request.form.get('interview_id')
+    question_id = request.form.get('question_id')
+    question_text = request.form.get('question_text')
+    round_type = request.form.get('round_type', 'technical')
+
+    if not all([interview_id, question_text]):
+        return jsonify({'error': 'Missing required fields'}), 400
+
+    clip = audio_clips.ingest(request.files['audio'])
+
+    try:
+        # Voice analysis runs while Whisper transcribes; evaluation needs the transcript
+        voice_future = answer_executor.submit(proctoring_service.analyze_voice_stress, clip)
+        transcription = groq_service.transcribe_audio(clip)
+
+        if not transcription or not transcription.strip():
+            return jsonify({
+                'error': 'No speech detected in the recording',
+                'audio_id': clip.audio_id,
+                'voice_analysis': voice_future.result()
+            }), 400
+
+        result = evaluate_and_store_answer(
+            db, interview_id, question_id, question_text, transcription, round_type,
+            voice_analysis=voice_future, deferred=is_deferred(db, interview_id)
         )
 
         return jsonify({
+            'transcription': transcription,
+            'audio_id': clip.audio_id,
+            **result
+        }), 200
+
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+def is_deferred(db, interview_id):
+    """Whether an interview defers answer evaluation to /complete"""
+    interview = db.interviews.find_one({'_id': ObjectId(interview_id)}, {'evaluation_mode': 1})
+    return bool(interview) and interview.get('evaluation_mode') == 'deferred'
+
+
+def evaluate_and_store_answer(db, interview_id, question_id, question_text, user_answer,
+                              round_type='technical', voice_analysis=None, deferred=False):
+    """Evaluate an answer, generate follow-ups and store them on the interview.
+
+    voice_analysis may be a Future still running alongside the evaluation.
+    Deferred answers are stored unevaluated for /complete to evaluate.
+    """
+    question_data = {
+        'question_id': question_id,
+        'question_text': question_text,
+        'user_answer': user_answer,
+        'transcription_raw': user_answer,
+        'timestamp': datetime.utcnow()
+    }
+
+    if deferred:
+        question_data['evaluation_pending'] = True
+        result = {
+            'deferred': True,
+            'message': 'Answer saved; it will be evaluated when the interview is completed'
+        }
+    else:
+        # Evaluate answer and generate follow-up questions concurrently
+        evaluation, follow_ups = interview_pipeline.evaluate_with_follow_up(
+            question=question_text,
+            answer=user_answer,
+            round_type=round_type
+        )
+        question_data.update({
+            'follow_up_questions': follow_ups,
+            'scores': evaluation['scores'],
+            'ai_feedback': evaluation['feedback']
+        })
+        result = {
             'scores': evaluation['scores'],
             'feedback': evaluation['feedback'],
             'follow_up_questions': follow_ups,
             'suggestions': evaluation.get('suggestions', [])
-        }), 200
+        }
 
-    except Exception as e:
-        return jsonify({'error': str(e)}), 500
+    if isinstance(voice_analysis, Future):
+        voice_analysis = voice_analysis.result()
+    if voice_analysis is not None:
+        question_data['voice_analysis'] = voice_analysis
+        result['voice_analysis'] = voice_analysis
+
+    # Store in database
+    db.interviews.update_one(
+        {'_id': ObjectId(interview_id)},
+        {'$push': {'questions': question_data}}
+    )
+
+    return result
 
 
 @interview_bp.route('/complete', methods=['POST'])
@@ -235,8 +350,34 @@ def complete_interview():
     if not interview:
         return jsonify({'error': 'Interview not found'}), 404
 
-    # Calculate overall scores
     questions = interview.get('questions', [])
+    updates = {}
+    evaluations = []
+
+    # Deferred interviews evaluate every stored answer now, in a few batched requests
+    pending = [i for i, q in enumerate(questions) if q.get('evaluation_pending')]
+    if pending:
+        results = interview_pipeline.evaluate_answers(
+            [(questions[i].get('question_text', ''), questions[i].get('user_answer', '')) for i in pending],
+            round_type=interview.get('round_type', 'technical')
+        )
+        for i, evaluation in zip(pending, results):
+            questions[i].update({
+                'scores': evaluation['scores'],
+                'ai_feedback': evaluation['feedback'],
+                'evaluation_pending': False
+            })
+            # Positional paths so answers pushed meanwhile are left alone
+            for field in ('scores', 'ai_feedback', 'evaluation_pending'):
+                updates[f'questions.{i}.{field}'] = questions[i][field]
+            evaluations.append({
+                'question_id': questions[i].get('question_id'),
+                'scores': evaluation['scores'],
+                'feedback': evaluation['feedback'],
+                'suggestions': evaluation.get('suggestions', [])
+            })
+
+    # Calculate overall scores
     if questions:
         avg_scores = {
             'technical_correctness': 0,
@@ -269,21 +410,34 @@ def complete_interview():
             'overall': 0
         }
 
-    # Update interview
+    # Persist any proctoring events still buffered in this worker
+    current_app.config['proctoring_event_buffer'].flush(interview_id)
+
+    # Free the interview's detector schedule and face trackers now rather than at idle expiry
+    try:
+        proctoring_service.end_session(proctoring_session_id(interview_id))
+    except Exception as e:
+        print(f"Proctoring session cleanup error: {e}")
+
+    # Update interview, including any deferred evaluations, in one write
     db.interviews.update_one(
         {'_id': ObjectId(interview_id)},
         {'$set': {
+            **updates,
             'overall_scores': overall_scores,
             'completed_at': datetime.utcnow(),
             'status': 'completed'
         }}
     )
 
-    return jsonify({
+    response = {
         'message': 'Interview completed',
         'overall_scores': overall_scores,
         'interview_id': interview_id
-    }), 200
+    }
+    if evaluations:
+        response['evaluations'] = evaluations
+    return jsonify(response), 200
 
 
 @interview_bp.route('/history', methods=['GET'])
@@ -1,41 +1,134 @@
 from flask import Blueprint, request, jsonify, current_app
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from datetime import datetime
 from bson import ObjectId
 import base64
-import cv2
+import io
 import numpy as np
-from services.proctoring_service import ProctoringService
+from services.proctoring_server import create_proctoring_service
+from services.proctoring_log import summarize_log
+from services.audio_features import audio_clips
 
 proctoring_bp = Blueprint('proctoring', __name__)
-proctoring_service = ProctoringService()
+proctoring_service = create_proctoring_service()
+
+# Upper bound on frames accepted by a single /analyze-frames request
+MAX_FRAMES_PER_BATCH = 30
+
+
+# Raw request bodies with these content types are treated as a single encoded frame
+BINARY_FRAME_MIMETYPES = ('image/jpeg', 'image/png', 'image/webp', 'application/octet-stream')
+MAX_FRAME_BYTES = 5 * 1024 * 1024
+
+
+def decode_base64_frame(frame_data):
+    """Encoded image bytes from base64 (optionally data-URL prefixed) frame data"""
+    try:
+        return base64.b64decode(frame_data.split(',')[1] if ',' in frame_data else frame_data)
+    except (ValueError, TypeError):
+        raise ValueError('Could not decode frame')
+
+
+def read_frame_stream(stream, length=None):
+    """Read an encoded image from a stream straight into a NumPy buffer.
+
+    Frames stay encoded here; the proctoring service decodes them where the
+    models run, so inference servers receive compact JPEG bytes.
+    """
+    if isinstance(stream, io.BytesIO):
+        # Small multipart uploads are already in memory; use a view of them
+        return stream.getbuffer()
+
+    if not length:
+        data = stream.read(MAX_FRAME_BYTES + 1)
+        if len(data) > MAX_FRAME_BYTES:
+            raise ValueError('Frame exceeds maximum upload size')
+        return data
+
+    if length > MAX_FRAME_BYTES:
+        raise ValueError('Frame exceeds maximum upload size')
+
+    buffer = np.empty(length, np.uint8)
+    view = memoryview(buffer)
+    received = 0
+    while received < length:
+        chunk = stream.readinto(view[received:])
+        if not chunk:
+            break
+        received += chunk
+
+    return buffer[:received]
+
+
+def proctoring_session_id(interview_id):
+    """Scope a proctoring session to the requesting user and interview"""
+    return f'{get_jwt_identity()}:{interview_id}' if interview_id else None
+
+
+def read_request_frame():
+    """Return (encoded frame, interview_id) from a raw image body, multipart upload or base64 JSON"""
+    if request.mimetype in BINARY_FRAME_MIMETYPES:
+        return read_frame_stream(request.stream, request.content_length), request.args.get('interview_id')
+
+    if 'frame' in request.files:
+        return read_frame_stream(request.files['frame'].stream), request.form.get('interview_id')
+
+    data = request.get_json(silent=True) or {}
+    frame_data = data.get('frame')  # Base64 encoded image
+    return (decode_base64_frame(frame_data) if frame_data else None), data.get('interview_id')
+
+
+def read_request_frames():
+    """Return (encoded frames, interview_id) from a multipart upload or base64 JSON"""
+    if 'frames' in request.files:
+        uploads = request.files.getlist('frames')
+        if len(uploads) > MAX_FRAMES_PER_BATCH:
+            raise ValueError(f'At most {MAX_FRAMES_PER_BATCH} frames per request')
+        return [read_frame_stream(upload.stream) for upload in uploads], request.form.get('interview_id')
+
+    data = request.get_json(silent=True) or {}
+    frames_data = data.get('frames') or []  # List of base64 encoded images
+    if len(frames_data) > MAX_FRAMES_PER_BATCH:
+        raise ValueError(f'At most {MAX_FRAMES_PER_BATCH} frames per request')
+    return [decode_base64_frame(frame_data) for frame_data in frames_data], data.get('interview_id')
+
+
+def read_request_audio():
+    """Return the uploaded audio clip, or the cached clip named by audio_id"""
+    if 'audio' in request.files:
+        return audio_clips.ingest(request.files['audio'])
+
+    audio_id = request.form.get('audio_id') or (request.get_json(silent=True) or {}).get('audio_id')
+    if not audio_id:
+        raise ValueError('No audio file provided')
+
+    clip = audio_clips.get(audio_id)
+    if clip is None:
+        raise LookupError('Audio clip not found or expired; upload the audio again')
+    return clip
 
 
 @proctoring_bp.route('/analyze-frame', methods=['POST'])
 @jwt_required()
 def analyze_frame():
     """Analyze a single video frame for proctoring"""
-    data = request.get_json()
-
-    interview_id = data.get('interview_id')
-    frame_data = data.get('frame')  # Base64 encoded image
+    try:
+        frame, interview_id = read_request_frame()
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
 
-    if not frame_data:
+    if frame is None:
         return jsonify({'error': 'No frame data provided'}), 400
 
     try:
-        # Decode base64 image
-        img_data = base64.b64decode(frame_data.split(',')[1] if ',' in frame_data else frame_data)
-        nparr = np.frombuffer(img_data, np.uint8)
-        frame = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
-
         # Analyze frame
-        analysis = proctoring_service.analyze_frame(frame)
+        analysis = proctoring_service.analyze_encoded_frames(
+            [frame], session_id=proctoring_session_id(interview_id)
+        )[0]
 
         # Log violations if any
         if analysis.get('violations') and interview_id:
             log_proctoring_event(
-                current_app.config['db'],
+                current_app.config['proctoring_event_buffer'],
                 interview_id,
                 get_jwt_identity(),
                 analysis['violations']
@@ -43,6 +136,47 @@ def analyze_frame():
 
         return jsonify(analysis), 200
 
+    except ValueError as e:
+        # The frame could not be decoded
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@proctoring_bp.route('/analyze-frames', methods=['POST'])
+@jwt_required()
+def analyze_frames():
+    """Analyze a batch of video frames for proctoring"""
+    try:
+        frames, interview_id = read_request_frames()
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    if not frames:
+        return jsonify({'error': 'No frame data provided'}), 400
+
+    try:
+        # Analyze all frames with a single batched YOLO call
+        analyses = proctoring_service.analyze_encoded_frames(
+            frames, session_id=proctoring_session_id(interview_id)
+        )
+        summary = proctoring_service.summarize_frames(analyses)
+
+        # Log violations from the whole batch
+        violations = [v for analysis in analyses for v in analysis.get('violations', [])]
+        if violations and interview_id:
+            log_proctoring_event(
+                current_app.config['proctoring_event_buffer'],
+                interview_id,
+                get_jwt_identity(),
+                violations
+            )
+
+        return jsonify({'frames': analyses, 'summary': summary}), 200
+
+    except ValueError as e:
+        # The frame could not be decoded
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -51,13 +185,15 @@ def analyze_frame():
 @jwt_required()
 def analyze_audio():
     """Analyze audio for background noise"""
-    if 'audio' not in request.files:
-        return jsonify({'error': 'No audio file provided'}), 400
-
-    audio_file = request.files['audio']
+    try:
+        clip = read_request_audio()
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except LookupError as e:
+        return jsonify({'error': str(e)}), 404
 
     try:
-        analysis = proctoring_service.analyze_audio(audio_file)
+        analysis = proctoring_service.analyze_audio(clip)
         return jsonify(analysis), 200
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -67,22 +203,22 @@ def analyze_audio():
 @jwt_required()
 def analyze_emotion():
     """Analyze emotion from video frame"""
-    data = request.get_json()
-    frame_data = data.get('frame')
+    try:
+        frame, _ = read_request_frame()
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
 
-    if not frame_data:
+    if frame is None:
         return jsonify({'error': 'No frame data provided'}), 400
 
     try:
-        # Decode base64 image
-        img_data = base64.b64decode(frame_data.split(',')[1] if ',' in frame_data else frame_data)
-        nparr = np.frombuffer(img_data, np.uint8)
-        frame = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
-
         # Analyze emotion
-        emotion_data = proctoring_service.analyze_emotion(frame)
+        emotion_data = proctoring_service.analyze_encoded_emotion(frame)
         return jsonify(emotion_data), 200
 
+    except ValueError as e:
+        # The frame could not be decoded
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -91,13 +227,15 @@ def analyze_emotion():
 @jwt_required()
 def analyze_voice():
     """Analyze voice for stress and confidence"""
-    if 'audio' not in request.files:
-        return jsonify({'error': 'No audio file provided'}), 400
-
-    audio_file = request.files['audio']
+    try:
+        clip = read_request_audio()
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except LookupError as e:
+        return jsonify({'error': str(e)}), 404
 
     try:
-        analysis = proctoring_service.analyze_voice_stress(audio_file)
+        analysis = proctoring_service.analyze_voice_stress(clip)
         return jsonify(analysis), 200
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -109,6 +247,7 @@ def get_proctoring_log(interview_id):
     """Get proctoring log for an interview"""
     db = current_app.config['db']
     user_id = get_jwt_identity()
+    flush_proctoring_events(interview_id)
 
     log = db.proctoring_logs.find_one({
         'interview_id': ObjectId(interview_id),
@@ -118,6 +257,7 @@ def get_proctoring_log(interview_id):
     if not log:
         return jsonify({'events': [], 'summary': {}}), 200
 
+    log['summary'] = summarize_log(log)
     log['_id'] = str(log['_id'])
     log['interview_id'] = str(log['interview_id'])
     log['user_id'] = str(log['user_id'])
@@ -130,99 +270,32 @@ def get_proctoring_log(interview_id):
 @proctoring_bp.route('/integrity-score/<interview_id>', methods=['GET'])
 @jwt_required()
 def get_integrity_score(interview_id):
-    """Calculate and return integrity score for an interview"""
+    """Return the integrity score for an interview from its summary counters"""
     db = current_app.config['db']
     user_id = get_jwt_identity()
+    flush_proctoring_events(interview_id)
 
-    log = db.proctoring_logs.find_one({
-        'interview_id': ObjectId(interview_id),
-        'user_id': ObjectId(user_id)
-    })
-
-    if not log:
-        return jsonify({
-            'integrity_score': 100,
-            'total_violations': 0,
-            'face_visible_percentage': 100,
-            'attention_score': 100
-        }), 200
-
-    summary = log.get('summary', {})
-    return jsonify(summary), 200
-
-
-def log_proctoring_event(db, interview_id, user_id, violations):
-    """Log proctoring violations to database"""
-    for violation in violations:
-        event = {
-            'timestamp': datetime.utcnow(),
-            'event_type': violation['type'],
-            'severity': violation['severity'],
-            'details': violation.get('details', '')
-        }
-
-        # Upsert proctoring log
-        db.proctoring_logs.update_one(
-            {
-                'interview_id': ObjectId(interview_id),
-                'user_id': ObjectId(user_id)
-            },
-            {
-                '$push': {'events': event},
-                '$setOnInsert': {
-                    'created_at': datetime.utcnow()
-                }
-            },
-            upsert=True
-        )
-
-        # Update summary
-        update_proctoring_summary(db, interview_id, user_id)
-
-
-def update_proctoring_summary(db, interview_id, user_id):
-    """Update proctoring summary statistics"""
-    log = db.proctoring_logs.find_one({
-        'interview_id': ObjectId(interview_id),
-        'user_id': ObjectId(user_id)
-    })
-
-    if not log:
-        return
-
-    events = log.get('events', [])
-    total_violations = len(events)
-
-    # Calculate severity-weighted score
-    severity_weights = {'low': 1, 'medium': 3, 'high': 5}
-    total_weight = sum(severity_weights.get(e.get('severity', 'low'), 1) for e in events)
-
-    # Calculate integrity score (starts at 100, decreases with violations)
-    integrity_score = max(0, 100 - (total_weight * 2))
-
-    # Calculate other metrics
-    face_not_visible_count = sum(1 for e in events if e.get('event_type') == 'face_not_visible')
-    looking_away_count = sum(1 for e in events if e.get('event_type') == 'looking_away')
-
-    # Rough estimates
-    face_visible_percentage = max(0, 100 - (face_not_visible_count * 5))
-    attention_score = max(0, 100 - (looking_away_count * 3))
-
-    summary = {
-        'total_violations': total_violations,
-        'integrity_score': integrity_score,
-        'face_visible_percentage': face_visible_percentage,
-        'attention_score': attention_score
-    }
-
-    db.proctoring_logs.update_one(
+    log = db.proctoring_logs.find_one(
         {
             'interview_id': ObjectId(interview_id),
             'user_id': ObjectId(user_id)
         },
-        {'$set': {'summary': summary}}
+        {'summary': 1}
     )
 
+    return jsonify(summarize_log(log)), 200
+
+
+def log_proctoring_event(event_buffer, interview_id, user_id, violations):
+    """Queue proctoring violations; the buffer bulk-writes them with summary counters"""
+    # Violations reused from a skipped stage were already logged when that stage ran
+    event_buffer.add(interview_id, user_id, [v for v in violations if not v.get('reused')])
+
+
+def flush_proctoring_events(interview_id):
+    """Write this worker's buffered events for an interview before reading its log"""
+    current_app.config['proctoring_event_buffer'].flush(interview_id)
+
 
 @proctoring_bp.route('/timeline/<interview_id>', methods=['GET'])
 @jwt_required()
@@ -230,6 +303,7 @@ def get_proctoring_timeline(interview_id):
     """Get timeline of proctoring events for visualization"""
     db = current_app.config['db']
     user_id = get_jwt_identity()
+    flush_proctoring_events(interview_id)
 
     log = db.proctoring_logs.find_one({
         'interview_id': ObjectId(interview_id),
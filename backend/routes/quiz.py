@@ -1,9 +1,12 @@
-from flask import Blueprint, request, jsonify, current_app
+import json
+from flask import Blueprint, request, jsonify, current_app, Response, stream_with_context
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from datetime import datetime
 from bson import ObjectId
 from services.gemini_service import GeminiService
 from services.groq_service import GroqService
+from services.quiz_bank import QuizItemBank, QUIZ_BANK_BATCH_SIZE, normalize_text
+from services.chunked_generation import generate_in_chunks, valid_count, MAX_GENERATION_COUNT
 
 quiz_bp = Blueprint('quiz', __name__)
 gemini_service = GeminiService()
@@ -28,24 +31,22 @@ def generate_quiz():
     if subject not in SUBJECTS:
         return jsonify({'error': 'Invalid subject'}), 400
 
-    try:
-        # Generate quiz using Gemini
-        prompt = f"""Generate {num_questions} multiple choice questions for {subject} - {topic}.
-        Difficulty: {difficulty}
-
-        Format each question as:
-        Q: [Question text]
-        A) [Option A]
-        B) [Option B]
-        C) [Option C]
-        D) [Option D]
-        Correct: [Letter]
-        Explanation: [Brief explanation of why this is correct]
-
-        Make questions test conceptual understanding, not just memorization."""
+    if not valid_count(num_questions):
+        return jsonify({'error': f'num_questions must be an integer from 1 to {MAX_GENERATION_COUNT}'}), 400
 
-        response = gemini_service.generate_content(prompt)
-        questions = parse_quiz_questions(response, num_questions)
+    try:
+        # Assemble the quiz from the item bank; the LLM only tops the bank up
+        bank = QuizItemBank(db.quiz_items)
+        questions = bank.sample(subject, topic, difficulty, num_questions)
+
+        if len(questions) < num_questions:
+            bank.top_up(
+                subject, topic, difficulty, generate_quiz_items,
+                count=max(num_questions - len(questions), QUIZ_BANK_BATCH_SIZE)
+            )
+            questions = bank.sample(subject, topic, difficulty, num_questions)
+        else:
+            bank.top_up_in_background(subject, topic, difficulty, generate_quiz_items)
 
         # Create quiz document (without correct answers exposed)
         quiz_doc = {
@@ -64,17 +65,9 @@ def generate_quiz():
         result = db.quizzes.insert_one(quiz_doc)
 
         # Return questions without correct answers
-        questions_for_user = []
-        for q in questions:
-            questions_for_user.append({
-                'question_id': q['question_id'],
-                'question_text': q['question_text'],
-                'options': q['options']
-            })
-
         return jsonify({
             'quiz_id': str(result.inserted_id),
-            'questions': questions_for_user,
+            'questions': [question_for_user(q) for q in questions],
             'subject': subject,
             'topic': topic,
             'total_questions': len(questions)
@@ -84,54 +77,232 @@ def generate_quiz():
         return jsonify({'error': str(e)}), 500
 
 
+@quiz_bp.route('/generate/stream', methods=['POST'])
+@jwt_required()
+def generate_quiz_stream():
+    """Generate MCQ quiz, sending each question over Server-Sent Events as soon as it is ready"""
+    db = current_app.config['db']
+    user_id = get_jwt_identity()
+    data = request.get_json()
+
+    subject = data.get('subject')
+    topic = data.get('topic', 'General')
+    num_questions = data.get('num_questions', 10)
+    difficulty = data.get('difficulty', 'medium')
+
+    if subject not in SUBJECTS:
+        return jsonify({'error': 'Invalid subject'}), 400
+
+    if not valid_count(num_questions):
+        return jsonify({'error': f'num_questions must be an integer from 1 to {MAX_GENERATION_COUNT}'}), 400
+
+    bank = QuizItemBank(db.quiz_items)
+
+    def events():
+        try:
+            # Banked questions go out immediately; only the shortfall is generated
+            questions = bank.sample(subject, topic, difficulty, num_questions)
+            for q in questions:
+                yield sse_event('question', question_for_user(q))
+
+            if len(questions) < num_questions:
+                seen = {normalize_text(q['question_text']) for q in questions}
+                generated = []
+                needed = num_questions - len(questions)
+                prompt = build_quiz_prompt(
+                    subject, topic, difficulty, needed,
+                    avoid=[q['question_text'] for q in questions]
+                )
+
+                parser = QuizStreamParser()
+                for text in gemini_service.stream_content(prompt, max_tokens=max(2048, 250 * needed)):
+                    for q in parser.feed(text):
+                        if add_streamed_question(q, questions, generated, seen, num_questions):
+                            yield sse_event('question', question_for_user(q))
+                for q in parser.finish():
+                    if add_streamed_question(q, questions, generated, seen, num_questions):
+                        yield sse_event('question', question_for_user(q))
+
+            else:
+                generated = []
+                bank.top_up_in_background(subject, topic, difficulty, generate_quiz_items)
+
+            if not questions:
+                yield sse_event('error', {'error': 'No questions could be generated'})
+                return
+
+            # The quiz document is written once, after the stream ends
+            result = db.quizzes.insert_one({
+                'user_id': ObjectId(user_id),
+                'subject': subject,
+                'topic': topic,
+                'questions': questions,
+                'score': 0,
+                'total_questions': len(questions),
+                'correct_answers': 0,
+                'time_taken_seconds': 0,
+                'created_at': datetime.utcnow(),
+                'status': 'in_progress'
+            })
+
+            # Streamed questions join the bank for later quizzes; before 'done',
+            # since the client may close the stream as soon as it sees it
+            if generated:
+                bank.add(subject, topic, difficulty, generated)
+
+            yield sse_event('done', {
+                'quiz_id': str(result.inserted_id),
+                'subject': subject,
+                'topic': topic,
+                'total_questions': len(questions)
+            })
+
+        except Exception as e:
+            print(f"Quiz stream error: {e}")
+            yield sse_event('error', {'error': str(e)})
+
+    return Response(
+        stream_with_context(events()),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+
+def add_streamed_question(question, questions, generated, seen, limit):
+    """Append a streamed question unless the quiz is full or already has it"""
+    key = normalize_text(question['question_text'])
+    if len(questions) >= limit or key in seen:
+        return False
+    seen.add(key)
+    question['question_id'] = len(questions)
+    questions.append(question)
+    generated.append(question)
+    return True
+
+
+def question_for_user(question):
+    """Question as sent to the user, without the correct answer"""
+    return {
+        'question_id': question['question_id'],
+        'question_text': question['question_text'],
+        'options': question['options']
+    }
+
+
+def sse_event(event, data):
+    """Format one Server-Sent Events message"""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+def generate_quiz_items(subject, topic, difficulty, num_questions, avoid=None):
+    """Generate and parse MCQs for the quiz item bank, in parallel chunks for large counts"""
+    def generate_chunk(count, focus):
+        # Generate quiz using Gemini
+        prompt = build_quiz_prompt(subject, topic, difficulty, count, focus, avoid)
+
+        # Not cached: the bank already keeps every parsed question, and top-ups need new ones
+        response = gemini_service.generate_content(prompt)
+        return parse_quiz_questions(response, count)
+
+    questions = generate_in_chunks(generate_chunk, num_questions, lambda q: q['question_text'])
+    for question_id, question in enumerate(questions):
+        question['question_id'] = question_id
+    return questions
+
+
+def build_quiz_prompt(subject, topic, difficulty, num_questions, focus=None, avoid=None):
+    """MCQ generation prompt in the format parse_quiz_questions reads"""
+    prompt = f"""Generate {num_questions} multiple choice questions for {subject} - {topic}.
+    Difficulty: {difficulty}
+    {f'Focus on: {focus}' if focus else ''}
+
+    Format each question as:
+    Q: [Question text]
+    A) [Option A]
+    B) [Option B]
+    C) [Option C]
+    D) [Option D]
+    Correct: [Letter]
+    Explanation: [Brief explanation of why this is correct]
+
+    Make questions test conceptual understanding, not just memorization."""
+
+    if avoid:
+        prompt += "\n\nDo not repeat these existing questions:\n" + "\n".join(f"- {text}" for text in avoid)
+    return prompt
+
+
 def parse_quiz_questions(response, count):
     """Parse AI response into quiz format"""
-    questions = []
-    lines = response.strip().split('\n')
-    current_q = None
-    current_options = []
-    current_correct = None
-    current_explanation = None
-    question_id = 0
-
-    for line in lines:
+    parser = QuizStreamParser()
+    questions = parser.feed(response.strip()) + parser.finish()
+    return questions[:count]
+
+
+class QuizStreamParser:
+    """Incremental parse_quiz_questions: feed text as it streams in, get questions as they complete.
+
+    A question is complete once its Explanation line ends, or failing that
+    when the next question starts or the stream finishes.
+    """
+
+    def __init__(self):
+        self.buffer = ''
+        self.question_id = 0
+        self._start(None)
+
+    def feed(self, text):
+        """Add streamed text; returns the questions it completed"""
+        self.buffer += text
+        *lines, self.buffer = self.buffer.split('\n')
+        return [q for q in map(self._line, lines) if q]
+
+    def finish(self):
+        """Parse whatever is left once the stream ends; returns the questions it completed"""
+        questions = [self._line(self.buffer), self._complete()]
+        self.buffer = ''
+        return [q for q in questions if q]
+
+    def _start(self, question_text):
+        self.current_q = question_text
+        self.current_options = []
+        self.current_correct = None
+        self.current_explanation = None
+        self.emitted = False
+
+    def _line(self, line):
         line = line.strip()
         if line.startswith('Q:'):
-            if current_q and current_options and current_correct:
-                questions.append({
-                    'question_id': question_id,
-                    'question_text': current_q,
-                    'options': current_options,
-                    'correct_answer': current_correct,
-                    'explanation': current_explanation or '',
-                    'user_answer': None,
-                    'is_correct': None
-                })
-                question_id += 1
-            current_q = line[2:].strip()
-            current_options = []
-            current_correct = None
-            current_explanation = None
-        elif line.startswith(('A)', 'B)', 'C)', 'D)')):
-            current_options.append(line)
+            question = self._complete()
+            self._start(line[2:].strip())
+            return question
+        if self.emitted:
+            return None
+
+        if line.startswith(('A)', 'B)', 'C)', 'D)')):
+            self.current_options.append(line)
         elif line.startswith('Correct:'):
-            current_correct = line.split(':')[1].strip()
+            self.current_correct = line.split(':')[1].strip()
         elif line.startswith('Explanation:'):
-            current_explanation = line.split(':', 1)[1].strip()
-
-    # Add last question
-    if current_q and current_options and current_correct:
-        questions.append({
-            'question_id': question_id,
-            'question_text': current_q,
-            'options': current_options,
-            'correct_answer': current_correct,
-            'explanation': current_explanation or '',
+            self.current_explanation = line.split(':', 1)[1].strip()
+            return self._complete()
+        return None
+
+    def _complete(self):
+        if self.emitted or not (self.current_q and self.current_options and self.current_correct):
+            return None
+        self.emitted = True
+        question = {
+            'question_id': self.question_id,
+            'question_text': self.current_q,
+            'options': self.current_options,
+            'correct_answer': self.current_correct,
+            'explanation': self.current_explanation or '',
             'user_answer': None,
             'is_correct': None
-        })
-
-    return questions[:count]
+        }
+        self.question_id += 1
+        return question
 
 
 @quiz_bp.route('/submit', methods=['POST'])
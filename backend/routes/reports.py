@@ -9,6 +9,8 @@ from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, Tabl
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib import colors
 from reportlab.lib.units import inch
+from services.proctoring_log import summarize_log
+from routes.proctoring import flush_proctoring_events
 
 reports_bp = Blueprint('reports', __name__)
 
@@ -32,7 +34,8 @@ def generate_report(interview_id):
     # Get user data
     user = db.users.find_one({'_id': ObjectId(user_id)})
 
-    # Get proctoring data
+    # Get proctoring data, including events this worker still has buffered
+    flush_proctoring_events(interview_id)
     proctoring_log = db.proctoring_logs.find_one({
         'interview_id': ObjectId(interview_id)
     })
@@ -145,7 +148,7 @@ def generate_interview_pdf(interview, user, proctoring_log):
     # Proctoring Summary
     if proctoring_log:
         story.append(Paragraph("Proctoring Summary", heading_style))
-        summary = proctoring_log.get('summary', {})
+        summary = summarize_log(proctoring_log)
         story.append(Paragraph(f"Integrity Score: {summary.get('integrity_score', 100):.1f}%", styles['Normal']))
         story.append(Paragraph(f"Total Violations: {summary.get('total_violations', 0)}", styles['Normal']))
         story.append(Paragraph(f"Attention Score: {summary.get('attention_score', 100):.1f}%", styles['Normal']))
@@ -248,7 +251,7 @@ def calculate_prs(interview, proctoring_log):
 
     integrity = 100
     if proctoring_log:
-        integrity = proctoring_log.get('summary', {}).get('integrity_score', 100)
+        integrity = summarize_log(proctoring_log)['integrity_score']
 
     prs = technical + communication + confidence + (integrity * 0.25)
     return round(prs, 2)
@@ -0,0 +1,197 @@
+import hashlib
+import io
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+
+import librosa
+import numpy as np
+import soundfile as sf
+
+# Audio analyses resample clips to this rate; pitch and energy of speech need no more
+ANALYSIS_SAMPLE_RATE = int(os.getenv('PROCTORING_VOICE_SAMPLE_RATE', 16000))
+HOP_SECONDS = 0.01
+N_FFT = 1024
+# Speaking voice fundamental frequency range (Hz) searched for pitch
+PITCH_RANGE = (75, 400)
+# Clips above this size stay in the uploading worker; MongoDB documents are capped at 16 MB
+MAX_SHARED_CLIP_BYTES = 15 * 1024 * 1024
+
+
+def decode_audio(data, sr=None):
+    """Decode an encoded clip in memory to mono float32, resampled to sr if given"""
+    try:
+        y, native_sr = sf.read(io.BytesIO(data), dtype='float32', always_2d=True)
+    except Exception:
+        # Formats libsndfile can't read (e.g. webm) need a file for librosa's audioread fallback
+        with tempfile.NamedTemporaryFile(delete=False) as temp:
+            temp.write(data)
+            temp_path = temp.name
+        try:
+            return librosa.load(temp_path, sr=sr)
+        finally:
+            os.unlink(temp_path)
+
+    y = y.mean(axis=1)
+    if sr and native_sr != sr:
+        y = librosa.resample(y, orig_sr=native_sr, target_sr=sr)
+        native_sr = sr
+    return y, native_sr
+
+
+class AudioFeatures:
+    """Energy, flatness and pitch of a clip, all taken from one decode and one STFT"""
+
+    def __init__(self, y, sr):
+        self.sr = sr
+        self.duration = len(y) / sr
+        self.hop_length = max(1, round(sr * HOP_SECONDS))
+
+        magnitude = np.abs(librosa.stft(y, n_fft=N_FFT, hop_length=self.hop_length))
+
+        self.rms = librosa.feature.rms(y=y, frame_length=4 * self.hop_length, hop_length=self.hop_length)[0]
+        self.flatness = librosa.feature.spectral_flatness(S=magnitude)[0]
+
+        # Pitch of the strongest bin in every frame, voiced frames only
+        pitches, magnitudes = librosa.piptrack(
+            S=magnitude, sr=sr, hop_length=self.hop_length,
+            fmin=PITCH_RANGE[0], fmax=PITCH_RANGE[1]
+        )
+        pitch = pitches[magnitudes.argmax(axis=0), np.arange(pitches.shape[1])]
+        self.pitch = pitch[pitch > 0]
+
+
+class AudioClip:
+    """An uploaded answer clip shared by transcription and every audio analysis"""
+
+    def __init__(self, audio_id, data, filename):
+        self.audio_id = audio_id
+        self.data = data
+        self.filename = filename
+        self.created_at = time.monotonic()
+        self._features = None
+        self._lock = threading.Lock()
+
+    @property
+    def features(self):
+        """Decode the clip and compute its features on first use"""
+        if self._features is None:
+            with self._lock:
+                if self._features is None:
+                    y, sr = decode_audio(self.data, sr=ANALYSIS_SAMPLE_RATE)
+                    self._features = AudioFeatures(y, sr)
+        return self._features
+
+
+class AudioClipCache:
+    """Uploaded clips keyed by content hash, with LRU eviction and a TTL.
+
+    Transcription and the voice and noise analyses of one answer share a
+    single clip, so it is decoded and featurized once however many
+    endpoints read it. Clip bytes are also kept in a MongoDB collection
+    shared by all workers, expiring through a TTL index, so an audio_id
+    resolves on whichever worker serves the next request; decoded
+    features stay in the worker's LRU.
+    """
+
+    def __init__(self, collection=None, max_clips=None, ttl_seconds=None):
+        self.collection = collection
+        self.max_clips = max_clips or int(os.getenv('PROCTORING_AUDIO_CACHE_SIZE', 32))
+        self.ttl_seconds = ttl_seconds or float(os.getenv('PROCTORING_AUDIO_CACHE_SECONDS', 600))
+        self._clips = OrderedDict()
+        self._lock = threading.Lock()
+        self._index_ready = False
+
+    def attach(self, collection):
+        """Share clips between workers through a MongoDB collection"""
+        self.collection = collection
+        self._index_ready = False
+
+    def ingest(self, audio_file):
+        """Store an uploaded file and return its clip, reusing an identical earlier upload"""
+        data = audio_file.read()
+        audio_id = hashlib.sha256(data).hexdigest()
+
+        with self._lock:
+            clip = self._lookup(audio_id)
+            if clip is not None:
+                return clip
+            clip = self._remember(AudioClip(audio_id, data, getattr(audio_file, 'filename', None) or 'audio.wav'))
+
+        self._share(clip)
+        return clip
+
+    def get(self, audio_id):
+        """Return a stored clip, or None if it was never uploaded or has expired"""
+        with self._lock:
+            clip = self._lookup(audio_id)
+        if clip is not None:
+            return clip
+
+        # Uploaded through another worker
+        document = self._find(audio_id)
+        if document is None:
+            return None
+        with self._lock:
+            return self._lookup(audio_id) or self._remember(
+                AudioClip(audio_id, document['data'], document.get('filename') or 'audio.wav')
+            )
+
+    def _remember(self, clip):
+        self._clips[clip.audio_id] = clip
+        while len(self._clips) > self.max_clips:
+            self._clips.popitem(last=False)
+        return clip
+
+    def _share(self, clip):
+        if self.collection is None or len(clip.data) > MAX_SHARED_CLIP_BYTES:
+            return
+        now = datetime.utcnow()
+        try:
+            self._ensure_index()
+            # Same content, same _id: a repeated upload only refreshes the expiry
+            self.collection.update_one(
+                {'_id': clip.audio_id},
+                {
+                    '$setOnInsert': {'data': clip.data, 'filename': clip.filename, 'created_at': now},
+                    '$set': {'expires_at': now + timedelta(seconds=self.ttl_seconds)}
+                },
+                upsert=True
+            )
+        except Exception as e:
+            print(f"Audio clip store error: {e}")
+
+    def _find(self, audio_id):
+        if self.collection is None:
+            return None
+        try:
+            # The TTL monitor only runs once a minute, so check expiry here too
+            return self.collection.find_one(
+                {'_id': audio_id, 'expires_at': {'$gt': datetime.utcnow()}},
+                {'data': 1, 'filename': 1}
+            )
+        except Exception as e:
+            print(f"Audio clip read error: {e}")
+            return None
+
+    def _ensure_index(self):
+        if not self._index_ready:
+            self.collection.create_index('expires_at', expireAfterSeconds=0)
+            self._index_ready = True
+
+    def _lookup(self, audio_id):
+        clip = self._clips.get(audio_id)
+        if clip is None:
+            return None
+        if time.monotonic() - clip.created_at > self.ttl_seconds:
+            del self._clips[audio_id]
+            return None
+        self._clips.move_to_end(audio_id)
+        return clip
+
+
+# Shared by the interview and proctoring routes; app.py attaches the MongoDB store
+audio_clips = AudioClipCache()
@@ -0,0 +1,42 @@
+import os
+import threading
+
+
+class BackgroundThread:
+    """A daemon thread that is started on first use and again whenever it is not alive.
+
+    Threads do not survive fork(). A forked child starts its own thread on
+    first use, but any queue or pending-work state the owner keeps is a copy
+    of the parent's taken mid-use; owners reset that state with
+    after_fork_in_child.
+    """
+
+    def __init__(self, target, name):
+        self.target = target
+        self.name = name
+        self._thread = None
+        self._lock = threading.Lock()
+        after_fork_in_child(self._reset)
+
+    def ensure_started(self):
+        """Start the thread unless it is already running in this process"""
+        if self._thread is None or not self._thread.is_alive():
+            with self._lock:
+                if self._thread is None or not self._thread.is_alive():
+                    self._thread = threading.Thread(target=self.target, name=self.name, daemon=True)
+                    self._thread.start()
+
+    def join(self, timeout=None):
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def _reset(self):
+        # The lock may have been held by a parent thread at the moment of the fork
+        self._thread = None
+        self._lock = threading.Lock()
+
+
+def after_fork_in_child(callback):
+    """Run callback in a forked child process, where platforms support it"""
+    if hasattr(os, 'register_at_fork'):
+        os.register_at_fork(after_in_child=callback)
@@ -0,0 +1,76 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from services.quiz_bank import normalize_text
+
+# Items per LLM call when a large set is split into parallel chunks
+GENERATION_CHUNK_SIZE = int(os.getenv('GENERATION_CHUNK_SIZE', 8))
+
+# Largest quiz or flashcard set a single request may ask for
+MAX_GENERATION_COUNT = int(os.getenv('MAX_GENERATION_COUNT', 50))
+
+# A different angle per chunk keeps parallel chunks from producing the same items
+FOCUS_HINTS = [
+    'core definitions and terminology',
+    'how it works internally',
+    'comparisons and trade-offs between approaches',
+    'practical examples and real-world applications',
+    'common pitfalls and misconceptions',
+    'edge cases and advanced scenarios',
+    'problem solving and numerical questions',
+    'design decisions and best practices'
+]
+
+_chunk_executor = ThreadPoolExecutor(
+    max_workers=int(os.getenv('GENERATION_MAX_PARALLEL_CHUNKS', 8)),
+    thread_name_prefix='generation-chunk'
+)
+
+
+def valid_count(value):
+    """Whether a client-supplied item count is an integer from 1 to MAX_GENERATION_COUNT"""
+    return isinstance(value, int) and not isinstance(value, bool) and 1 <= value <= MAX_GENERATION_COUNT
+
+
+def chunk_counts(total, chunk_size=None):
+    """Split total into near-equal chunks of at most chunk_size"""
+    chunk_size = chunk_size or GENERATION_CHUNK_SIZE
+    chunks = max(1, -(-total // chunk_size))
+    return [total // chunks + (1 if i < total % chunks else 0) for i in range(chunks)]
+
+
+def generate_in_chunks(generate_chunk, count, item_text, chunk_size=None):
+    """Generate count items as parallel chunks, merged in order with duplicates removed.
+
+    generate_chunk(chunk_count, focus) returns parsed items for one chunk,
+    focus being None when the request fits in a single chunk; item_text(item)
+    is the text compared to spot duplicates. Failed chunks are skipped
+    unless every chunk fails.
+    """
+    counts = chunk_counts(count, chunk_size)
+    if len(counts) == 1:
+        return generate_chunk(count, None)
+
+    futures = [
+        _chunk_executor.submit(generate_chunk, chunk_count, FOCUS_HINTS[i % len(FOCUS_HINTS)])
+        for i, chunk_count in enumerate(counts)
+    ]
+
+    items, seen, errors = [], set(), []
+    for future in futures:
+        try:
+            chunk = future.result()
+        except Exception as e:
+            print(f"Chunk generation error: {e}")
+            errors.append(e)
+            continue
+
+        for item in chunk:
+            key = normalize_text(item_text(item))
+            if key not in seen:
+                seen.add(key)
+                items.append(item)
+
+    if len(errors) == len(futures):
+        raise errors[0]
+    return items[:count]
@@ -0,0 +1,25 @@
+# Collections whose index this process has already ensured
+_indexed_collections = set()
+
+
+class ContentStore:
+    """Base for generated study content kept per (subject, topic, difficulty).
+
+    Topics match case- and whitespace-insensitively through a topic_key
+    field, and each collection's index is created once per process.
+    """
+
+    index = [('subject', 1), ('topic_key', 1), ('difficulty', 1)]
+    index_options = {}
+
+    def __init__(self, collection):
+        self.collection = collection
+        if collection.full_name not in _indexed_collections:
+            collection.create_index(self.index, **self.index_options)
+            _indexed_collections.add(collection.full_name)
+
+    def _key(self, subject, topic, difficulty):
+        return {'subject': subject, 'topic_key': self._topic_key(topic), 'difficulty': difficulty}
+
+    def _topic_key(self, topic):
+        return ' '.join((topic or '').lower().split())
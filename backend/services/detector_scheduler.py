@@ -0,0 +1,116 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+
+import cv2
+import numpy as np
+
+
+# Per-stage cadences. A stage runs when any of its conditions is met,
+# otherwise the session reuses the stage's last result.
+DEFAULT_CADENCES = {
+    # Face presence, count and gaze all come from one face mesh pass
+    'face': {'every_n_frames': int(os.getenv('PROCTORING_FACE_EVERY_N_FRAMES', 1))},
+    'phone': {
+        'every_n_frames': int(os.getenv('PROCTORING_PHONE_EVERY_N_FRAMES', 5)),
+        'on_scene_change': True
+    },
+    'emotion': {'interval_seconds': float(os.getenv('PROCTORING_EMOTION_INTERVAL_SECONDS', 2.0))}
+}
+
+# Mean absolute difference (0-255) between thumbnails that counts as a scene change
+SCENE_CHANGE_THRESHOLD = float(os.getenv('PROCTORING_SCENE_CHANGE_THRESHOLD', 12.0))
+THUMBNAIL_SIZE = (32, 24)
+
+
+class SessionSchedule:
+    """Tracks which detectors are due for one interview session"""
+
+    def __init__(self, cadences, scene_change_threshold=SCENE_CHANGE_THRESHOLD):
+        self.cadences = cadences
+        self.scene_change_threshold = scene_change_threshold
+        self.lock = threading.Lock()
+        self.frame_index = -1
+        self.last_seen = time.monotonic()
+        self.thumbnail = None
+        self.last_run = {}  # stage -> (frame_index, timestamp, thumbnail)
+        self.results = {}
+
+    def begin_frame(self, frame):
+        """Advance the schedule to a new frame"""
+        self.frame_index += 1
+        self.last_seen = time.monotonic()
+        self.thumbnail = None
+        if any(c.get('on_scene_change') for c in self.cadences.values()):
+            gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+            self.thumbnail = cv2.resize(gray, THUMBNAIL_SIZE, interpolation=cv2.INTER_AREA).astype(np.int16)
+
+    def is_due(self, stage):
+        """Return True (and mark the stage as run) if the stage should run on this frame"""
+        cadence = self.cadences.get(stage, {})
+        last = self.last_run.get(stage)
+        # Due-ness depends only on when the stage last ran; results are stored after a
+        # whole batch has been scheduled
+        due = last is None
+
+        if not due and cadence.get('every_n_frames'):
+            due = self.frame_index - last[0] >= cadence['every_n_frames']
+
+        if not due and cadence.get('interval_seconds') is not None:
+            due = self.last_seen - last[1] >= cadence['interval_seconds']
+
+        if not due and cadence.get('on_scene_change'):
+            due = self._scene_changed(last[2])
+
+        if due:
+            self.last_run[stage] = (self.frame_index, self.last_seen, self.thumbnail)
+        return due
+
+    def store(self, stage, result):
+        """Remember the latest result of a stage"""
+        self.results[stage] = result
+
+    def last(self, stage, default=None):
+        """Return the latest result of a stage"""
+        return self.results.get(stage, default)
+
+    def _scene_changed(self, reference):
+        if reference is None or self.thumbnail is None:
+            return False
+        return float(np.mean(np.abs(self.thumbnail - reference))) > self.scene_change_threshold
+
+
+class DetectorScheduler:
+    """Per-interview detector schedules with LRU eviction and idle expiry"""
+
+    def __init__(self, cadences=None, max_sessions=1000, idle_timeout_seconds=1800):
+        self.cadences = {stage: dict(cadence) for stage, cadence in DEFAULT_CADENCES.items()}
+        for stage, cadence in (cadences or {}).items():
+            self.cadences.setdefault(stage, {}).update(cadence)
+        self.max_sessions = max_sessions
+        self.idle_timeout_seconds = idle_timeout_seconds
+        self._sessions = OrderedDict()
+        self._lock = threading.Lock()
+
+    def session(self, session_id):
+        """Get or create the schedule for a session"""
+        now = time.monotonic()
+        with self._lock:
+            schedule = self._sessions.get(session_id)
+            if schedule is not None and now - schedule.last_seen > self.idle_timeout_seconds:
+                schedule = None
+            if schedule is None:
+                schedule = SessionSchedule(self.cadences)
+                self._sessions[session_id] = schedule
+            self._sessions.move_to_end(session_id)
+
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+
+            return schedule
+
+    def end_session(self, session_id):
+        """Drop the schedule for a finished session"""
+        with self._lock:
+            self._sessions.pop(session_id, None)
@@ -0,0 +1,83 @@
+import hashlib
+import os
+from datetime import datetime
+
+from pymongo import UpdateOne
+
+from services.content_store import ContentStore
+from services.quiz_bank import normalize_text
+
+# Cards requested from the LLM when the library can't fill a set
+FLASHCARD_LIBRARY_BATCH_SIZE = int(os.getenv('FLASHCARD_LIBRARY_BATCH_SIZE', 20))
+
+
+class FlashcardLibrary(ContentStore):
+    """Flashcards shared by every user, addressed by a hash of their content.
+
+    User sets hold card references plus their own review state, and are
+    hydrated with question and answer text from the library when read.
+    """
+
+    def card_hash(self, subject, topic, difficulty, question):
+        """Content address of a card; near-duplicate questions share it"""
+        content = '|'.join([subject, self._topic_key(topic), difficulty, normalize_text(question)])
+        return hashlib.sha1(content.encode()).hexdigest()
+
+    def sample(self, subject, topic, difficulty, count):
+        """Return up to count random library cards as {'_id', 'question', 'answer'}"""
+        return list(self.collection.aggregate([
+            {'$match': self._key(subject, topic, difficulty)},
+            {'$sample': {'size': count}},
+            {'$project': {'question': 1, 'answer': 1}}
+        ]))
+
+    def add(self, subject, topic, difficulty, cards):
+        """Store parsed cards, keeping the existing copy of any near-duplicate"""
+        now = datetime.utcnow()
+        operations = [
+            UpdateOne(
+                {'_id': self.card_hash(subject, topic, difficulty, card['question'])},
+                {'$setOnInsert': {
+                    **self._key(subject, topic, difficulty),
+                    'topic': topic,
+                    'question': card['question'],
+                    'answer': card['answer'],
+                    'created_at': now
+                }},
+                upsert=True
+            )
+            for card in cards
+        ]
+        if operations:
+            self.collection.bulk_write(operations, ordered=False)
+
+    def hydrate(self, cards):
+        """Fill card references in a user's set with their library question and answer"""
+        refs = [card['card_ref'] for card in cards if card.get('card_ref')]
+        if not refs:
+            return cards
+
+        library = {
+            doc['_id']: doc
+            for doc in self.collection.find({'_id': {'$in': refs}}, {'question': 1, 'answer': 1})
+        }
+
+        hydrated = []
+        for card in cards:
+            doc = library.get(card.get('card_ref'))
+            if doc is not None:
+                card = {**card, 'question': doc['question'], 'answer': doc['answer']}
+            hydrated.append(card)
+        return hydrated
+
+
+def card_reference(card_id, library_card):
+    """A user's reference to a library card with fresh review state"""
+    return {
+        'card_id': card_id,
+        'card_ref': library_card['_id'],
+        'difficulty': 'medium',
+        'mastered': False,
+        'review_count': 0,
+        'last_reviewed': None
+    }
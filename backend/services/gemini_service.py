@@ -1,6 +1,6 @@
-import os
-from groq import Groq
 from dotenv import load_dotenv
+from services.llm_clients import llm_clients
+from services.llm_cache import llm_cache
 
 load_dotenv()
 
@@ -9,17 +9,47 @@ class GeminiService:
     """Using Groq as backend instead of Gemini"""
 
     def __init__(self):
-        self.client = Groq(api_key=os.getenv('GROQ_API_KEY'))
         self.model = "llama-3.3-70b-versatile"
 
-    def generate_content(self, prompt, max_tokens=2048, temperature=0.7):
-        """Generate content using Groq"""
+    @property
+    def client(self):
+        """Groq client behind this service"""
+        return llm_clients.groq()
+
+    def generate_content(self, prompt, max_tokens=2048, temperature=0.7, cache=False):
+        """Generate content using Groq; with cache, identical requests reuse a stored response"""
+        messages = [
+            {"role": "user", "content": prompt}
+        ]
+
+        return llm_cache.cached_call(
+            self.model, messages, {'max_tokens': max_tokens, 'temperature': temperature},
+            lambda: self._complete(messages, max_tokens, temperature), cache
+        )
+
+    def stream_content(self, prompt, max_tokens=2048, temperature=0.7):
+        """Yield generated text from Groq piece by piece as the tokens arrive"""
+        try:
+            stream = self.client.chat.completions.create(
+                model=self.model,
+                messages=[{"role": "user", "content": prompt}],
+                max_tokens=max_tokens,
+                temperature=temperature,
+                stream=True
+            )
+            for chunk in stream:
+                delta = chunk.choices[0].delta.content if chunk.choices else None
+                if delta:
+                    yield delta
+        except Exception as e:
+            print(f"Streaming generation error: {e}")
+            raise e
+
+    def _complete(self, messages, max_tokens, temperature):
         try:
             response = self.client.chat.completions.create(
                 model=self.model,
-                messages=[
-                    {"role": "user", "content": prompt}
-                ],
+                messages=messages,
                 max_tokens=max_tokens,
                 temperature=temperature
             )
@@ -40,7 +70,7 @@ class GeminiService:
         Cover key concepts progressively from basic to advanced.
         Include practical examples where helpful."""
 
-        return self.generate_content(prompt, max_tokens=3000)
+        return self.generate_content(prompt, max_tokens=3000, cache=True)
 
     def generate_mcqs(self, subject, topic, count=10, difficulty='medium'):
         """Generate MCQ questions"""
@@ -58,7 +88,7 @@ class GeminiService:
 
         Questions should test understanding, not just memorization."""
 
-        return self.generate_content(prompt, max_tokens=4000)
+        return self.generate_content(prompt, max_tokens=4000, cache=True)
 
     def generate_company_questions(self, company, round_type, count=5):
         """Generate company-specific interview questions"""
@@ -82,7 +112,7 @@ class GeminiService:
 
         Make questions progressively challenging."""
 
-        return self.generate_content(prompt, max_tokens=2000)
+        return self.generate_content(prompt, max_tokens=2000, cache=True)
 
     def explain_concept(self, concept, subject):
         """Generate detailed explanation of a concept"""
@@ -96,7 +126,7 @@ class GeminiService:
 
         Keep it concise but comprehensive."""
 
-        return self.generate_content(prompt, max_tokens=1500)
+        return self.generate_content(prompt, max_tokens=1500, cache=True)
 
     def generate_study_plan(self, weak_areas, duration_weeks=4):
         """Generate a study plan based on weak areas"""
@@ -1,26 +1,39 @@
-import os
-from groq import Groq
 from dotenv import load_dotenv
-import tempfile
+from services.llm_clients import llm_clients
+from services.llm_cache import llm_cache
+from services.audio_features import AudioClip, audio_clips
 
 load_dotenv()
 
 
 class GroqService:
     def __init__(self):
-        self.client = Groq(api_key=os.getenv('GROQ_API_KEY'))
         self.default_model = "llama-3.3-70b-versatile"
         self.fast_model = "llama-3.3-70b-versatile"
 
-    def generate_content(self, prompt, model=None, max_tokens=2048, temperature=0.7):
-        """Generate content using Groq LLaMA or Mixtral"""
+    @property
+    def client(self):
+        """Groq client from llm_clients, created once per process"""
+        return llm_clients.groq()
+
+    def generate_content(self, prompt, model=None, max_tokens=2048, temperature=0.7, cache=False):
+        """Generate content using Groq LLaMA or Mixtral; with cache, identical requests reuse a stored response"""
+        model = model or self.default_model
+        messages = [
+            {"role": "system", "content": "You are a helpful AI assistant for interview preparation."},
+            {"role": "user", "content": prompt}
+        ]
+
+        return llm_cache.cached_call(
+            model, messages, {'max_tokens': max_tokens, 'temperature': temperature},
+            lambda: self._complete(model, messages, max_tokens, temperature), cache
+        )
+
+    def _complete(self, model, messages, max_tokens, temperature):
         try:
             response = self.client.chat.completions.create(
-                model=model or self.default_model,
-                messages=[
-                    {"role": "system", "content": "You are a helpful AI assistant for interview preparation."},
-                    {"role": "user", "content": prompt}
-                ],
+                model=model,
+                messages=messages,
                 max_tokens=max_tokens,
                 temperature=temperature
             )
@@ -29,24 +42,18 @@ class GroqService:
             print(f"Groq generation error: {e}")
             raise e
 
-    def transcribe_audio(self, audio_file):
-        """Transcribe audio using Groq Whisper"""
+    def transcribe_audio(self, audio):
+        """Transcribe an AudioClip or uploaded file using Groq Whisper"""
         try:
-            # Save to temporary file
-            with tempfile.NamedTemporaryFile(suffix='.wav', delete=False) as temp_file:
-                audio_file.save(temp_file.name)
-                temp_path = temp_file.name
-
-            # Transcribe
-            with open(temp_path, 'rb') as f:
-                transcription = self.client.audio.transcriptions.create(
-                    model="whisper-large-v3",
-                    file=f,
-                    response_format="text"
-                )
-
-            # Clean up
-            os.unlink(temp_path)
+            if not isinstance(audio, AudioClip):
+                audio = audio_clips.ingest(audio)
+
+            # Send the clip straight from memory
+            transcription = self.client.audio.transcriptions.create(
+                model="whisper-large-v3",
+                file=(audio.filename, audio.data),
+                response_format="text"
+            )
 
             return transcription
 
@@ -84,6 +91,61 @@ suggestions: [suggestions text]"""
         print(f"Evaluation response:\n{response[:500]}...")  # Log first 500 chars
         return self._parse_evaluation(response)
 
+    def evaluate_answers(self, items, context=""):
+        """Evaluate several (question, answer) pairs in one request.
+
+        Returns one evaluation per pair, or None where the response has no
+        section for it.
+        """
+        answers = "\n\n".join(
+            f"### Answer {i}\nQuestion: {question}\nAnswer: {answer}"
+            for i, (question, answer) in enumerate(items, 1)
+        )
+        prompt = f"""Evaluate each of these {len(items)} interview answers independently:
+
+{answers}
+{f'Context: {context}' if context else ''}
+
+For each answer provide scores (0-100) for:
+1. Technical Correctness
+2. Communication Skills
+3. Answer Structure
+4. Reasoning Depth
+5. Completeness
+
+Also provide brief feedback and suggestions for improvement.
+
+Format, repeated for every answer in order:
+### Answer [number]
+technical_correctness: [score]
+communication_skills: [score]
+answer_structure: [score]
+reasoning_depth: [score]
+completeness: [score]
+feedback: [feedback text]
+suggestions: [suggestions text]"""
+
+        response = self.generate_content(prompt, max_tokens=400 * len(items))
+        return self._parse_evaluations(response, len(items))
+
+    def _parse_evaluations(self, response, count):
+        """Split a multi-answer evaluation on its '### Answer N' headers and parse each section"""
+        import re
+
+        evaluations = [None] * count
+        # A header may carry trailing text ("### Answer 1: Explain TCP", "Answer 3 (Question: joins)");
+        # without a markdown heading, the number must be followed by punctuation or the line end so
+        # feedback such as "Answer 2 is wrong" is not taken for a header
+        sections = re.split(
+            r'^(?=\s*#|\W*answer\s+\d+\s*(?:[^\w\s]|$))\W*answer\s+(\d+)\b.*$',
+            response, flags=re.IGNORECASE | re.MULTILINE
+        )
+        for number, section in zip(sections[1::2], sections[2::2]):
+            index = int(number) - 1
+            if 0 <= index < count and evaluations[index] is None:
+                evaluations[index] = self._parse_evaluation(section)
+        return evaluations
+
     def _parse_evaluation(self, response):
         """Parse evaluation response into structured format"""
         import re
@@ -173,9 +235,9 @@ Format each on a new line starting with "- "."""
 
         return follow_ups[:3]
 
-    def fast_generate(self, prompt, max_tokens=1024):
+    def fast_generate(self, prompt, max_tokens=1024, cache=False):
         """Fast generation using Mixtral"""
-        return self.generate_content(prompt, model=self.fast_model, max_tokens=max_tokens)
+        return self.generate_content(prompt, model=self.fast_model, max_tokens=max_tokens, cache=cache)
 
     def analyze_resume(self, resume_text, job_description=""):
         """Analyze resume and provide improvement suggestions"""
@@ -1,20 +1,19 @@
-import os
 from dotenv import load_dotenv
-from langchain_groq import ChatGroq
 from langchain_core.prompts import PromptTemplate
 from langchain.chains import LLMChain
+from services.llm_clients import llm_clients
 
 load_dotenv()
 
 
 class LangChainService:
     def __init__(self):
-        # Initialize Groq LLM
-        self.groq_llm = ChatGroq(
-            api_key=os.getenv('GROQ_API_KEY'),
-            model_name="llama-3.3-70b-versatile",
-            temperature=0.7
-        )
+        self.model_name = "llama-3.3-70b-versatile"
+
+    @property
+    def groq_llm(self):
+        """Process-wide Groq LLM shared with every other service"""
+        return llm_clients.chat_groq(self.model_name, temperature=0.7)
 
     def generate_content(self, prompt):
         """Generate content using Groq LLM"""
@@ -0,0 +1,154 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+
+from services.singleflight import llm_requests
+
+
+class LLMResponseCache:
+    """Caches LLM responses keyed on a normalized hash of model, messages and parameters.
+
+    Lookups go to an in-process LRU tier first, then to a MongoDB tier
+    shared by all workers whose documents expire through a TTL index.
+    Call sites opt in per request, since most prompts are one-off.
+    """
+
+    def __init__(self, collection=None, max_entries=None, ttl_seconds=None):
+        self.collection = collection
+        self.max_entries = max_entries or int(os.getenv('LLM_CACHE_SIZE', 512))
+        self.ttl_seconds = ttl_seconds or float(os.getenv('LLM_CACHE_TTL_SECONDS', 86400))
+        self.enabled = os.getenv('LLM_CACHE_ENABLED', 'true').lower() == 'true'
+
+        self._entries = OrderedDict()  # key -> (expires_at monotonic, response)
+        self._lock = threading.Lock()
+        self._index_ready = False
+        self._counters = {'memory_hits': 0, 'mongo_hits': 0, 'misses': 0}
+
+    def attach(self, collection):
+        """Use a MongoDB collection as the shared tier"""
+        self.collection = collection
+        self._index_ready = False
+
+    def key(self, model, messages, params=None):
+        """Stable hash of a request; whitespace differences in prompts don't change it"""
+        payload = {
+            'model': model,
+            'messages': [
+                {'role': m['role'], 'content': ' '.join(m['content'].split())}
+                for m in messages
+            ],
+            'params': params or {}
+        }
+        return hashlib.sha256(json.dumps(payload, sort_keys=True).encode()).hexdigest()
+
+    def cached_call(self, model, messages, params, fn, cache=False):
+        """Run a completion once per identical in-flight request; with cache, reuse a stored response"""
+        key = self.key(model, messages, params)
+
+        def generate():
+            if cache:
+                return self.get_or_generate(key, fn, model)
+            return fn()
+
+        return llm_requests.do(key, generate)
+
+    def get_or_generate(self, key, generate, model=None):
+        """Return the cached response for a request key, or generate and cache it"""
+        if not self.enabled:
+            return generate()
+
+        response = self.get(key)
+        if response is None:
+            response = generate()
+            self.set(key, response, model)
+        return response
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[0] > time.monotonic():
+                    self._entries.move_to_end(key)
+                    self._counters['memory_hits'] += 1
+                    return entry[1]
+                del self._entries[key]
+
+        document = self._find(key)
+        if document is not None:
+            self._remember(key, document['response'])
+            with self._lock:
+                self._counters['mongo_hits'] += 1
+            return document['response']
+
+        with self._lock:
+            self._counters['misses'] += 1
+        return None
+
+    def set(self, key, response, model=None):
+        if not response:
+            return
+        self._remember(key, response)
+
+        if self.collection is None:
+            return
+        now = datetime.utcnow()
+        try:
+            self._ensure_index()
+            self.collection.update_one(
+                {'_id': key},
+                {'$set': {
+                    'response': response,
+                    'model': model,
+                    'created_at': now,
+                    'expires_at': now + timedelta(seconds=self.ttl_seconds)
+                }},
+                upsert=True
+            )
+        except Exception as e:
+            print(f"LLM cache write error: {e}")
+
+    def stats(self):
+        """Hit/miss counters for monitoring"""
+        with self._lock:
+            counters = dict(self._counters)
+            entries = len(self._entries)
+        lookups = sum(counters.values())
+        hits = counters['memory_hits'] + counters['mongo_hits']
+        return {
+            **counters,
+            'hit_rate': round(hits / lookups, 3) if lookups else 0,
+            'entries': entries
+        }
+
+    def _remember(self, key, response):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, response)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def _find(self, key):
+        if self.collection is None:
+            return None
+        try:
+            # The TTL monitor only runs once a minute, so check expiry here too
+            return self.collection.find_one(
+                {'_id': key, 'expires_at': {'$gt': datetime.utcnow()}},
+                {'response': 1}
+            )
+        except Exception as e:
+            print(f"LLM cache read error: {e}")
+            return None
+
+    def _ensure_index(self):
+        if not self._index_ready:
+            self.collection.create_index('expires_at', expireAfterSeconds=0)
+            self._index_ready = True
+
+
+# Shared by every LLM service; app.py attaches the MongoDB tier
+llm_cache = LLMResponseCache()
@@ -0,0 +1,102 @@
+import os
+import threading
+
+import httpx
+from dotenv import load_dotenv
+from groq import Groq
+
+load_dotenv()
+
+# Shared by every Groq and LangChain call in a worker process
+LLM_TIMEOUT_SECONDS = float(os.getenv('LLM_TIMEOUT_SECONDS', 60))
+LLM_CONNECT_TIMEOUT_SECONDS = float(os.getenv('LLM_CONNECT_TIMEOUT_SECONDS', 5))
+LLM_MAX_CONNECTIONS = int(os.getenv('LLM_MAX_CONNECTIONS', 50))
+LLM_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv('LLM_MAX_KEEPALIVE_CONNECTIONS', 20))
+LLM_KEEPALIVE_SECONDS = float(os.getenv('LLM_KEEPALIVE_SECONDS', 60))
+LLM_MAX_RETRIES = int(os.getenv('LLM_MAX_RETRIES', 2))
+
+
+class LLMClientRegistry:
+    """Process-wide LLM clients on one keep-alive HTTP connection pool.
+
+    Services look clients up on every call instead of building their own,
+    so all call sites reuse warm TLS connections. Clients are created on
+    first use and rebuilt after a fork, since a connection pool must not be
+    shared between a pre-fork parent and its workers.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._pid = None
+        self._http_client = None
+        self._clients = {}
+
+    def http_client(self):
+        """The shared httpx client and its connection pool"""
+        self._check_pid()
+        if self._http_client is None:
+            with self._lock:
+                if self._http_client is None:
+                    self._http_client = httpx.Client(
+                        timeout=httpx.Timeout(LLM_TIMEOUT_SECONDS, connect=LLM_CONNECT_TIMEOUT_SECONDS),
+                        limits=httpx.Limits(
+                            max_connections=LLM_MAX_CONNECTIONS,
+                            max_keepalive_connections=LLM_MAX_KEEPALIVE_CONNECTIONS,
+                            keepalive_expiry=LLM_KEEPALIVE_SECONDS
+                        )
+                    )
+        return self._http_client
+
+    def groq(self, api_key=None):
+        """Shared Groq SDK client"""
+        api_key = api_key or os.getenv('GROQ_API_KEY')
+        return self._get(('groq', api_key), lambda: Groq(
+            api_key=api_key,
+            http_client=self.http_client(),
+            timeout=LLM_TIMEOUT_SECONDS,
+            max_retries=LLM_MAX_RETRIES
+        ))
+
+    def chat_groq(self, model_name, temperature=0.7, api_key=None):
+        """Shared LangChain ChatGroq model"""
+        from langchain_groq import ChatGroq
+
+        api_key = api_key or os.getenv('GROQ_API_KEY')
+        return self._get(('chat_groq', api_key, model_name, temperature), lambda: ChatGroq(
+            api_key=api_key,
+            model_name=model_name,
+            temperature=temperature,
+            http_client=self.http_client(),
+            request_timeout=LLM_TIMEOUT_SECONDS,
+            max_retries=LLM_MAX_RETRIES
+        ))
+
+    def close(self):
+        """Close the connection pool"""
+        with self._lock:
+            if self._http_client is not None and self._pid == os.getpid():
+                self._http_client.close()
+            self._http_client = None
+            self._clients = {}
+
+    def _get(self, key, factory):
+        self._check_pid()
+        client = self._clients.get(key)
+        if client is None:
+            with self._lock:
+                client = self._clients.get(key)
+                if client is None:
+                    client = self._clients[key] = factory()
+        return client
+
+    def _check_pid(self):
+        if self._pid != os.getpid():
+            with self._lock:
+                if self._pid != os.getpid():
+                    # Inherited from a parent process; drop without closing its sockets
+                    self._http_client = None
+                    self._clients = {}
+                    self._pid = os.getpid()
+
+
+llm_clients = LLMClientRegistry()
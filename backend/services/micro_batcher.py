@@ -0,0 +1,85 @@
+import os
+import queue
+import time
+from concurrent.futures import Future
+
+from services.background import BackgroundThread
+
+
+class MicroBatcher:
+    """Collects items submitted by concurrent requests and runs them through one batch call.
+
+    The worker waits up to max_wait_ms after the first queued item for more
+    items, up to max_batch_size, then hands each caller its own results.
+    With max_wait_ms set to 0 every submit runs the batch function directly.
+    """
+
+    def __init__(self, batch_fn, max_batch_size=None, max_wait_ms=None, name='micro-batcher'):
+        self.batch_fn = batch_fn
+        self.max_batch_size = max_batch_size or int(os.getenv('PROCTORING_BATCH_SIZE', 16))
+        self.max_wait_ms = max_wait_ms if max_wait_ms is not None else float(
+            os.getenv('PROCTORING_BATCH_MAX_WAIT_MS', 0)
+        )
+        self.name = name
+
+        self._queue = queue.Queue()
+        self._worker = BackgroundThread(self._run, name)
+        self._batches = 0
+        self._items = 0
+
+    def submit(self, items):
+        """Queue items and block until their results are ready"""
+        items = list(items)
+        if not items:
+            return []
+
+        if self.max_wait_ms <= 0:
+            return self._run_batch(items)
+
+        futures = []
+        for item in items:
+            future = Future()
+            self._queue.put((item, future))
+            futures.append(future)
+
+        self._worker.ensure_started()
+        return [future.result() for future in futures]
+
+    def stats(self):
+        """Batch counters for monitoring"""
+        return {
+            'batches': self._batches,
+            'items': self._items,
+            'avg_batch_size': round(self._items / self._batches, 2) if self._batches else 0,
+            'queued': self._queue.qsize()
+        }
+
+    def _run_batch(self, items):
+        results = list(self.batch_fn(items))
+        if len(results) != len(items):
+            # A short result list would otherwise leave the unmatched callers waiting forever
+            raise RuntimeError(f'{self.name} returned {len(results)} results for {len(items)} items')
+        self._batches += 1
+        self._items += len(items)
+        return results
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.max_wait_ms / 1000
+
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                try:
+                    batch.append(self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            try:
+                results = self._run_batch([item for item, _ in batch])
+                for (_, future), result in zip(batch, results):
+                    future.set_result(result)
+            except Exception as e:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
@@ -0,0 +1,185 @@
+import os
+import cv2
+import numpy as np
+
+# Class 67 is 'cell phone' in the COCO dataset
+PHONE_CLASS_ID = 67
+PHONE_CONFIDENCE = 0.4  # Lower threshold for better detection
+
+# Frames used to calibrate activation ranges for static int8 quantization
+MAX_CALIBRATION_FRAMES = 100
+
+
+def letterbox(frame, imgsz):
+    """Letterbox a BGR frame to the model size as a normalized CHW float32 array"""
+    h, w = frame.shape[:2]
+    scale = imgsz / max(h, w)
+    resized = cv2.resize(frame, (round(w * scale), round(h * scale)), interpolation=cv2.INTER_LINEAR)
+
+    canvas = np.full((imgsz, imgsz, 3), 114, dtype=np.uint8)
+    top = (imgsz - resized.shape[0]) // 2
+    left = (imgsz - resized.shape[1]) // 2
+    canvas[top:top + resized.shape[0], left:left + resized.shape[1]] = resized
+
+    rgb = cv2.cvtColor(canvas, cv2.COLOR_BGR2RGB)
+    return np.ascontiguousarray(rgb.transpose(2, 0, 1), dtype=np.float32) / 255.0
+
+
+class UltralyticsPhoneDetector:
+    """Phone detection with an ultralytics YOLO model.
+
+    Also loads exported models ultralytics can run itself, e.g. a
+    yolov8s_openvino_model/ directory or a .onnx file.
+    """
+
+    backend = 'ultralytics'
+
+    def __init__(self, model_path='yolov8s.pt', imgsz=640, confidence=PHONE_CONFIDENCE):
+        from ultralytics import YOLO
+        self.model = YOLO(model_path)
+        self.imgsz = imgsz
+        self.confidence = confidence
+
+    def detect(self, frames):
+        """Return one phone/no-phone flag per frame from a single batched call"""
+        if not frames:
+            return []
+
+        # Restrict NMS and the confidence filter to the phone class inside the model call
+        results = self.model(
+            list(frames),
+            imgsz=self.imgsz,
+            classes=[PHONE_CLASS_ID],
+            conf=self.confidence,
+            verbose=False
+        )
+        return [len(result.boxes) > 0 for result in results]
+
+
+class OnnxPhoneDetector:
+    """Phone detection with an exported YOLOv8 ONNX model on the ONNX Runtime CPU provider"""
+
+    backend = 'onnx'
+
+    def __init__(self, model_path, imgsz=640, confidence=PHONE_CONFIDENCE, threads=None):
+        import onnxruntime as ort
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if threads:
+            options.intra_op_num_threads = threads
+
+        self.session = ort.InferenceSession(model_path, options, providers=['CPUExecutionProvider'])
+        model_input = self.session.get_inputs()[0]
+        self.input_name = model_input.name
+
+        # Static exports fix the batch and image size; dynamic ones use symbolic dims
+        batch_dim, _, height_dim, _ = model_input.shape
+        self.dynamic_batch = not isinstance(batch_dim, int)
+        self.imgsz = height_dim if isinstance(height_dim, int) else imgsz
+        self.confidence = confidence
+
+    def detect(self, frames):
+        """Return one phone/no-phone flag per frame from a single batched call"""
+        if not frames:
+            return []
+
+        batch = np.stack([letterbox(frame, self.imgsz) for frame in frames])
+
+        if self.dynamic_batch:
+            predictions = self.session.run(None, {self.input_name: batch})[0]
+        else:
+            predictions = np.concatenate([
+                self.session.run(None, {self.input_name: batch[i:i + 1]})[0]
+                for i in range(len(batch))
+            ])
+
+        # YOLOv8 output is (batch, 4 + classes, anchors); only the phone row is read, and a
+        # phone is present if any anchor scores above the threshold, so no NMS is needed
+        phone_scores = predictions[:, 4 + PHONE_CLASS_ID, :]
+        return [bool(score > self.confidence) for score in phone_scores.max(axis=1)]
+
+
+def create_phone_detector(backend=None, model_path=None, imgsz=None):
+    """Build the phone detector configured by PROCTORING_PHONE_* environment variables"""
+    backend = (backend or os.getenv('PROCTORING_PHONE_BACKEND', 'ultralytics')).lower()
+    imgsz = imgsz or int(os.getenv('PROCTORING_PHONE_IMGSZ', 640))
+
+    if backend == 'onnx':
+        return OnnxPhoneDetector(
+            model_path or os.getenv('PROCTORING_PHONE_MODEL', 'yolov8s.onnx'),
+            imgsz=imgsz,
+            threads=int(os.getenv('PROCTORING_PHONE_THREADS', 0)) or None
+        )
+
+    if backend == 'openvino':
+        return UltralyticsPhoneDetector(
+            model_path or os.getenv('PROCTORING_PHONE_MODEL', 'yolov8s_openvino_model/'),
+            imgsz=imgsz
+        )
+
+    # yolov8s.pt is more accurate than yolov8n.pt (small vs nano)
+    return UltralyticsPhoneDetector(
+        model_path or os.getenv('PROCTORING_PHONE_MODEL', 'yolov8s.pt'),
+        imgsz=imgsz
+    )
+
+
+def export_phone_detector(weights='yolov8s.pt', imgsz=640, backend='onnx', int8=False, calibration_frames=None):
+    """Export YOLO weights for a CPU backend and return the exported model path.
+
+    With int8, ONNX exports are statically quantized with ONNX Runtime,
+    calibrated on calibration_frames (sample BGR frames, required), and
+    OpenVINO exports use ultralytics' INT8 export.
+    """
+    from ultralytics import YOLO
+
+    if backend == 'openvino':
+        return YOLO(weights).export(format='openvino', imgsz=imgsz, int8=int8)
+
+    if int8 and not calibration_frames:
+        raise ValueError('Static int8 quantization needs calibration frames')
+
+    path = YOLO(weights).export(format='onnx', imgsz=imgsz, dynamic=True, simplify=True)
+    if not int8:
+        return path
+    return quantize_phone_detector(path, calibration_frames, imgsz)
+
+
+def quantize_phone_detector(model_path, calibration_frames, imgsz=640):
+    """Statically quantize an exported ONNX model to int8 and return the quantized path.
+
+    Dynamic quantization turns convolutions into ConvInteger ops, which are
+    often slower than fp32 on CPU; static QDQ quantization keeps them as
+    fused int8 convolutions, with activation ranges taken from sample frames.
+    """
+    import onnxruntime as ort
+    from onnxruntime.quantization import CalibrationDataReader, QuantFormat, QuantType, quantize_static
+    from onnxruntime.quantization.shape_inference import quant_pre_process
+
+    input_name = ort.InferenceSession(model_path, providers=['CPUExecutionProvider']).get_inputs()[0].name
+
+    class FrameReader(CalibrationDataReader):
+        def __init__(self, frames):
+            # An even spread across the samples rather than just the first ones
+            step = max(1, len(frames) // MAX_CALIBRATION_FRAMES)
+            self.frames = iter(frames[::step][:MAX_CALIBRATION_FRAMES])
+
+        def get_next(self):
+            frame = next(self.frames, None)
+            return None if frame is None else {input_name: letterbox(frame, imgsz)[np.newaxis]}
+
+    prepared_path = model_path.replace('.onnx', '.prep.onnx')
+    quantized_path = model_path.replace('.onnx', '.int8.onnx')
+    quant_pre_process(model_path, prepared_path)
+    quantize_static(
+        prepared_path,
+        quantized_path,
+        FrameReader(list(calibration_frames)),
+        quant_format=QuantFormat.QDQ,
+        per_channel=True,
+        activation_type=QuantType.QUInt8,
+        weight_type=QuantType.QInt8
+    )
+    os.remove(prepared_path)
+    return quantized_path
@@ -0,0 +1,228 @@
+import os
+import threading
+from datetime import datetime
+from bson import ObjectId
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+
+from services.background import BackgroundThread
+
+# Severity weights used for the interview-level integrity score
+SEVERITY_WEIGHTS = {'low': 1, 'medium': 3, 'high': 5}
+
+# Event types with their own counter in the summary
+COUNTED_EVENT_TYPES = {
+    'face_not_visible': 'face_not_visible_count',
+    'looking_away': 'looking_away_count'
+}
+
+DEFAULT_SUMMARY = {
+    'integrity_score': 100,
+    'total_violations': 0,
+    'face_visible_percentage': 100,
+    'attention_score': 100
+}
+
+
+def log_counters(events):
+    """Summary counters for a list of log events"""
+    counters = {'summary.total_violations': 0, 'summary.severity_weight': 0}
+
+    for event in events:
+        counters['summary.total_violations'] += 1
+        counters['summary.severity_weight'] += SEVERITY_WEIGHTS.get(event.get('severity'), 1)
+
+        counter = COUNTED_EVENT_TYPES.get(event.get('event_type'))
+        if counter:
+            counters[f'summary.{counter}'] = counters.get(f'summary.{counter}', 0) + 1
+
+    return counters
+
+
+def build_log_update(violations, timestamp=None):
+    """Build one upsert that appends violations and bumps the summary counters"""
+    timestamp = timestamp or datetime.utcnow()
+    events = [
+        {
+            'timestamp': violation.get('timestamp', timestamp),
+            'event_type': violation['type'],
+            'severity': violation['severity'],
+            'details': violation.get('details', '')
+        }
+        for violation in violations
+    ]
+
+    return {
+        '$push': {'events': {'$each': events}},
+        '$inc': log_counters(events),
+        '$setOnInsert': {'created_at': timestamp}
+    }
+
+
+def seed_legacy_counters(collection, keys):
+    """Give logs written before counters were kept counters recomputed from their events.
+
+    Without this, the first $inc on such a log would start severity_weight
+    at zero while total_violations kept its old count.
+    """
+    legacy = collection.find(
+        {
+            '$or': [{'interview_id': interview_id, 'user_id': user_id} for interview_id, user_id in keys],
+            'summary.severity_weight': {'$exists': False}
+        },
+        {'events.event_type': 1, 'events.severity': 1}
+    )
+    for log in legacy:
+        counters = log_counters(log.get('events', []))
+        counters.update({f'summary.{counter}': counters.get(f'summary.{counter}', 0)
+                         for counter in COUNTED_EVENT_TYPES.values()})
+        # The $exists guard keeps a concurrent flush from seeding the same log twice
+        collection.update_one(
+            {'_id': log['_id'], 'summary.severity_weight': {'$exists': False}},
+            {'$set': counters}
+        )
+
+
+def summarize_log(log):
+    """Derive the proctoring summary from a log document's counters"""
+    if not log:
+        return dict(DEFAULT_SUMMARY)
+
+    counters = log.get('summary') or {}
+    if 'severity_weight' not in counters:
+        # Logs written before counters were kept store the derived summary directly
+        return {**DEFAULT_SUMMARY, **counters}
+
+    # Integrity starts at 100 and decreases with severity-weighted violations
+    return {
+        'total_violations': counters.get('total_violations', 0),
+        'integrity_score': max(0, 100 - counters['severity_weight'] * 2),
+        # Rough estimates
+        'face_visible_percentage': max(0, 100 - counters.get('face_not_visible_count', 0) * 5),
+        'attention_score': max(0, 100 - counters.get('looking_away_count', 0) * 3)
+    }
+
+
+class ProctoringEventBuffer:
+    """Coalesces proctoring events per interview and flushes them with bulk_write"""
+
+    def __init__(self, collection, max_events=None, flush_interval_seconds=None):
+        self.collection = collection
+        self.max_events = max_events or int(os.getenv('PROCTORING_EVENT_BUFFER_SIZE', 200))
+        self.flush_interval_seconds = flush_interval_seconds or float(
+            os.getenv('PROCTORING_EVENT_FLUSH_SECONDS', 5)
+        )
+        # Events kept across failed flushes before new ones are dropped
+        self.max_pending = self.max_events * 10
+
+        self._pending = {}  # (interview_id, user_id) -> [violation, ...]
+        self._pending_count = 0
+        self._in_flight = {}  # interview_id -> flushes currently writing its events
+        self._lock = threading.Lock()
+        self._written = threading.Condition(self._lock)
+        self._wake = threading.Event()
+        self._flusher = BackgroundThread(self._run, 'proctoring-event-flusher')
+        self._closed = False
+
+    def add(self, interview_id, user_id, violations):
+        """Queue violations for an interview; returns without touching the database"""
+        if not violations:
+            return
+
+        # Convert up front so malformed ids fail the request, not a later flush
+        key = (ObjectId(interview_id), ObjectId(user_id))
+        timestamp = datetime.utcnow()
+        with self._lock:
+            if self._pending_count >= self.max_pending:
+                print(f"Proctoring event buffer full, dropping {len(violations)} events")
+                return
+
+            events = self._pending.setdefault(key, [])
+            events.extend({**v, 'timestamp': v.get('timestamp', timestamp)} for v in violations)
+            self._pending_count += len(violations)
+
+            if self._pending_count >= self.max_events:
+                self._wake.set()
+
+        self._flusher.ensure_started()
+
+    def flush(self, interview_id=None):
+        """Write buffered events (all, or one interview's) in a single bulk_write.
+
+        For one interview, also waits for a background flush that has
+        already taken its events, so a read that follows sees them.
+        """
+        if interview_id is not None:
+            interview_id = ObjectId(interview_id)
+
+        with self._lock:
+            if interview_id is None:
+                batch, self._pending = self._pending, {}
+            else:
+                batch = {key: self._pending.pop(key) for key in list(self._pending) if key[0] == interview_id}
+            self._pending_count -= sum(len(events) for events in batch.values())
+            for key in batch:
+                self._in_flight[key[0]] = self._in_flight.get(key[0], 0) + 1
+
+        try:
+            written = self._write(batch) if batch else 0
+        finally:
+            with self._lock:
+                for key in batch:
+                    self._in_flight[key[0]] -= 1
+                    if not self._in_flight[key[0]]:
+                        del self._in_flight[key[0]]
+                self._written.notify_all()
+
+        if interview_id is not None:
+            with self._lock:
+                while self._in_flight.get(interview_id):
+                    self._written.wait()
+
+        return written
+
+    def _write(self, batch):
+        keys = list(batch)
+        operations = [
+            UpdateOne(
+                {'interview_id': key[0], 'user_id': key[1]},
+                build_log_update(batch[key]),
+                upsert=True
+            )
+            for key in keys
+        ]
+
+        try:
+            seed_legacy_counters(self.collection, keys)
+            self.collection.bulk_write(operations, ordered=False)
+        except BulkWriteError as e:
+            failed = [keys[error['index']] for error in e.details.get('writeErrors', [])]
+            print(f"Proctoring event flush failed for {len(failed)} interviews: {e}")
+            self._requeue({key: batch[key] for key in failed})
+        except Exception as e:
+            print(f"Proctoring event flush error: {e}")
+            self._requeue(batch)
+
+        return len(operations)
+
+    def close(self):
+        """Stop the background flusher and write everything still buffered"""
+        self._closed = True
+        self._wake.set()
+        self._flusher.join(timeout=self.flush_interval_seconds)
+        self.flush()
+
+    def _requeue(self, batch):
+        with self._lock:
+            for key, events in batch.items():
+                if self._pending_count + len(events) > self.max_pending:
+                    print(f"Proctoring event buffer full, dropping {len(events)} events")
+                    continue
+                self._pending[key] = events + self._pending.get(key, [])
+                self._pending_count += len(events)
+
+    def _run(self):
+        while not self._closed:
+            self._wake.wait(self.flush_interval_seconds)
+            self._wake.clear()
+            self.flush()
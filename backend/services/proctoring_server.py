@@ -0,0 +1,243 @@
+"""
+Standalone proctoring inference server.
+
+Loads the proctoring models once and serves frame analysis to web workers
+over a local Unix socket, so gunicorn workers stay lightweight and
+inference capacity can be sized separately from HTTP concurrency.
+
+Requests are pickled, so both sides must share PROCTORING_INFERENCE_AUTHKEY
+and the sockets live in a directory only the service user can access.
+Run one or more server processes (from backend/):
+
+    python -m services.proctoring_server --socket ~/.proctoring/proctoring.sock --processes 2
+
+and point the web workers at them:
+
+    PROCTORING_INFERENCE_SOCKETS=~/.proctoring/proctoring-0.sock,~/.proctoring/proctoring-1.sock
+"""
+import argparse
+import itertools
+import multiprocessing
+import os
+import threading
+import zlib
+from multiprocessing.connection import Client, Listener
+
+from services.proctoring_service import ProctoringService
+
+# Methods web workers may call on the server
+REMOTE_METHODS = {
+    'analyze_frames', 'analyze_encoded_frames', 'analyze_emotion', 'analyze_encoded_emotion',
+    'end_session', 'status', 'warm_up'
+}
+
+
+def _authkey():
+    authkey = os.getenv('PROCTORING_INFERENCE_AUTHKEY')
+    if not authkey:
+        raise RuntimeError('PROCTORING_INFERENCE_AUTHKEY must be set to use proctoring inference servers')
+    return authkey.encode()
+
+
+def _private_directory(address, create=False):
+    """Socket directory, which must belong to this user and be closed to everyone else"""
+    directory = os.path.dirname(os.path.abspath(address))
+    if create:
+        os.makedirs(directory, mode=0o700, exist_ok=True)
+
+    info = os.stat(directory)
+    if info.st_uid != os.getuid() or info.st_mode & 0o077:
+        raise RuntimeError(f'Socket directory {directory} must be owned by this user with mode 0700')
+    return directory
+
+
+def serve(address, authkey=None):
+    """Load models once and answer requests on a Unix socket until killed"""
+    authkey = authkey or _authkey()
+    _private_directory(address, create=True)
+
+    service = ProctoringService()
+    service.warm_up()
+
+    if os.path.exists(address):
+        os.unlink(address)
+
+    # Bind with a restrictive umask so the socket is never reachable by other users
+    umask = os.umask(0o177)
+    try:
+        listener = Listener(address, family='AF_UNIX', authkey=authkey)
+    finally:
+        os.umask(umask)
+    print(f"Proctoring inference server listening on {address}")
+
+    while True:
+        try:
+            connection = listener.accept()
+        except Exception as e:
+            print(f"Proctoring inference connection rejected: {e}")
+            continue
+        # One thread per web worker connection; concurrent requests share the micro-batchers
+        threading.Thread(target=_handle_connection, args=(service, connection), daemon=True).start()
+
+
+def _handle_connection(service, connection):
+    with connection:
+        while True:
+            try:
+                method, args, kwargs = connection.recv()
+            except (EOFError, OSError):
+                return
+
+            if method not in REMOTE_METHODS:
+                connection.send(('error', f'Unknown method: {method}'))
+                continue
+
+            try:
+                connection.send(('ok', getattr(service, method)(*args, **kwargs)))
+            except ValueError as e:
+                # Bad input, such as an undecodable frame
+                connection.send(('invalid', str(e)))
+            except Exception as e:
+                connection.send(('error', str(e)))
+
+
+class RemoteProctoringService(ProctoringService):
+    """ProctoringService that runs frame models in proctoring inference servers.
+
+    Audio analysis and frame summaries still run in the web worker; they
+    need no preloaded models.
+    """
+
+    def __init__(self, addresses, authkey=None):
+        super().__init__()
+        self.addresses = [os.path.expanduser(address) for address in addresses]
+        self.authkey = authkey or _authkey()
+        self._connections = threading.local()
+        self._round_robin = itertools.count()
+
+    def analyze_frames(self, frames, session_id=None):
+        return self._call('analyze_frames', [list(frames)], {'session_id': session_id}, session_id)
+
+    def analyze_encoded_frames(self, buffers, session_id=None):
+        # Encoded images are a fraction of the size of decoded frames, and the server decodes them
+        return self._call(
+            'analyze_encoded_frames', [[bytes(buffer) for buffer in buffers]], {'session_id': session_id}, session_id
+        )
+
+    def end_session(self, session_id):
+        # The session's schedule and trackers live on the server its frames went to
+        return self._call('end_session', [session_id], session_id=session_id)
+
+    def analyze_emotion(self, frame, face_box=None):
+        return self._call('analyze_emotion', [frame, face_box])
+
+    def analyze_encoded_emotion(self, buffer):
+        return self._call('analyze_encoded_emotion', [bytes(buffer)])
+
+    def warm_up(self):
+        """Check that every inference server reports its models ready"""
+        status = self.status()
+        self.ready = status['ready']
+        return status
+
+    def status(self):
+        servers = {}
+        for address in self.addresses:
+            try:
+                servers[address] = self._call('status', address=address)
+            except Exception as e:
+                servers[address] = {'ready': False, 'error': str(e)}
+        return {
+            'ready': all(server.get('ready') for server in servers.values()),
+            'servers': servers
+        }
+
+    def _call(self, method, args=(), kwargs=None, session_id=None, address=None):
+        if address is None:
+            address = self._pick_address(session_id)
+
+        # Retry once on a fresh connection if the server restarted. Only a failed send is
+        # retried: once a request is sent it may have run, and analyze_frames advances the
+        # session's schedule
+        for attempt in range(2):
+            connection = self._connection(address)
+            try:
+                connection.send((method, list(args), kwargs or {}))
+                break
+            except (EOFError, OSError):
+                self._drop_connection(address)
+                if attempt:
+                    raise
+
+        try:
+            status, result = connection.recv()
+        except (EOFError, OSError):
+            self._drop_connection(address)
+            raise
+
+        if status == 'invalid':
+            raise ValueError(result)
+        if status == 'error':
+            raise RuntimeError(result)
+        return result
+
+    def _pick_address(self, session_id):
+        # Sessions stick to one server, which holds their schedule and trackers
+        if session_id:
+            index = zlib.crc32(session_id.encode()) % len(self.addresses)
+        else:
+            index = next(self._round_robin) % len(self.addresses)
+        return self.addresses[index]
+
+    def _connection(self, address):
+        connections = self._connections.__dict__.setdefault('by_address', {})
+        if address not in connections:
+            # Refuse sockets another user could have bound while the server was down
+            _private_directory(address)
+            connections[address] = Client(address, family='AF_UNIX', authkey=self.authkey)
+        return connections[address]
+
+    def _drop_connection(self, address):
+        connection = self._connections.__dict__.get('by_address', {}).pop(address, None)
+        if connection is not None:
+            try:
+                connection.close()
+            except OSError:
+                pass
+
+
+def create_proctoring_service():
+    """Use the inference servers in PROCTORING_INFERENCE_SOCKETS if set, else load models in-process"""
+    sockets = [s.strip() for s in os.getenv('PROCTORING_INFERENCE_SOCKETS', '').split(',') if s.strip()]
+    if sockets:
+        return RemoteProctoringService(sockets)
+    return ProctoringService()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Proctoring inference server')
+    parser.add_argument('--socket', default='~/.proctoring/proctoring.sock',
+                        help='Unix socket path in a private directory; with several processes, '
+                             '-N is added before the extension')
+    parser.add_argument('--processes', type=int, default=1, help='Number of server processes to run')
+    args = parser.parse_args()
+    args.socket = os.path.expanduser(args.socket)
+    _authkey()
+
+    if args.processes == 1:
+        serve(args.socket)
+        return
+
+    root, extension = os.path.splitext(args.socket)
+    processes = [
+        multiprocessing.Process(target=serve, args=(f'{root}-{i}{extension}',))
+        for i in range(args.processes)
+    ]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+
+
+if __name__ == '__main__':
+    main()
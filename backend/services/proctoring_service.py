@@ -1,47 +1,276 @@
 import cv2
 import numpy as np
-import mediapipe as mp
-from ultralytics import YOLO
 import os
-import tempfile
-import librosa
+import threading
+from contextlib import nullcontext
+from services.detector_scheduler import DetectorScheduler
+from services.tracker_pool import TrackerPool
+from services.phone_detector import create_phone_detector
+from services.micro_batcher import MicroBatcher
+from services.audio_features import AudioClip, audio_clips
 
 # Suppress warnings
 os.environ['TF_CPP_MIN_LOG_LEVEL'] = '3'
 
+# Marks a model handle that has not been loaded yet (None means loading failed)
+_NOT_LOADED = object()
+
+# Output order of DeepFace's facial expression model
+EMOTION_LABELS = ['angry', 'disgust', 'fear', 'happy', 'sad', 'surprise', 'neutral']
+
+# Syllables per second of a normal speaking pace
+NORMAL_SYLLABLE_RATE = (2.5, 5.5)
+
+
+def decode_frame(buffer):
+    """Decode an encoded image buffer into a BGR frame without copying it"""
+    frame = cv2.imdecode(np.frombuffer(buffer, np.uint8), cv2.IMREAD_COLOR)
+    if frame is None:
+        raise ValueError('Could not decode frame')
+    return frame
+
 
 class ProctoringService:
     def __init__(self):
-        # Initialize MediaPipe with higher confidence for better accuracy
-        self.mp_face_mesh = mp.solutions.face_mesh
-        self.mp_face_detection = mp.solutions.face_detection
-        self.face_mesh = self.mp_face_mesh.FaceMesh(
-            max_num_faces=2,
-            refine_landmarks=True,
-            min_detection_confidence=0.6,
-            min_tracking_confidence=0.6
-        )
-        self.face_detection = self.mp_face_detection.FaceDetection(
-            model_selection=1,  # 1 = full-range model (better for varying distances)
-            min_detection_confidence=0.6
-        )
-
-        # Initialize YOLO for object detection (using 'small' model for better accuracy)
-        try:
-            # yolov8s.pt is more accurate than yolov8n.pt (small vs nano)
-            self.yolo_model = YOLO('yolov8s.pt')
-        except:
-            self.yolo_model = None
-            print("YOLO model not loaded. Phone detection disabled.")
+        # Model handles are loaded on first use or by warm_up()
+        self._models_lock = threading.RLock()
+        self._phone_detector = _NOT_LOADED
+        self._deepface = _NOT_LOADED
+        self._emotion_model = _NOT_LOADED
+        self.ready = False
+        self.warm_up_error = None
 
         # Eye gaze tracking landmarks
         self.LEFT_EYE = [362, 385, 387, 263, 373, 380]
         self.RIGHT_EYE = [33, 160, 158, 133, 153, 144]
         self.LEFT_IRIS = [474, 475, 476, 477]
         self.RIGHT_IRIS = [469, 470, 471, 472]
+        self.FOREHEAD = 10
+        self.CHIN = 152
+
+        # Index arrays for vectorized lookups: rows are (left eye, right eye)
+        self.IRIS_INDICES = np.array([self.LEFT_IRIS, self.RIGHT_IRIS])
+        self.EYE_CORNER_INDICES = np.array([
+            [self.LEFT_EYE[0], self.LEFT_EYE[3]],
+            [self.RIGHT_EYE[0], self.RIGHT_EYE[3]]
+        ])
+
+        # Per-interview cadence for each detector stage
+        self.scheduler = DetectorScheduler()
+
+        # Per-session MediaPipe graphs so tracking state never mixes between candidates
+        self.trackers = TrackerPool(self._create_trackers)
+
+        # Cross-session micro-batching: frames from concurrent requests share one forward pass
+        self.phone_batcher = MicroBatcher(self._run_phone_detector, name='phone-batcher')
+        self.emotion_batcher = MicroBatcher(self._analyze_emotion_batch, name='emotion-batcher')
+
+    def _create_trackers(self):
+        """Build one session's MediaPipe face mesh graph"""
+        import mediapipe as mp
+        # Initialize MediaPipe with higher confidence for better accuracy
+        return {
+            'face_mesh': mp.solutions.face_mesh.FaceMesh(
+                max_num_faces=2,
+                refine_landmarks=True,
+                min_detection_confidence=0.6,
+                min_tracking_confidence=0.6
+            )
+        }
+
+    @property
+    def phone_detector(self):
+        if self._phone_detector is _NOT_LOADED:
+            with self._models_lock:
+                if self._phone_detector is _NOT_LOADED:
+                    # Backend, model and input size come from PROCTORING_PHONE_* settings
+                    try:
+                        self._phone_detector = create_phone_detector()
+                    except Exception as e:
+                        self._phone_detector = None
+                        print(f"Phone detector not loaded. Phone detection disabled: {e}")
+        return self._phone_detector
+
+    @property
+    def deepface(self):
+        if self._deepface is _NOT_LOADED:
+            with self._models_lock:
+                if self._deepface is _NOT_LOADED:
+                    try:
+                        from deepface import DeepFace
+                        self._deepface = DeepFace
+                    except Exception as e:
+                        self._deepface = None
+                        print(f"DeepFace not loaded. Emotion analysis disabled: {e}")
+        return self._deepface
+
+    @property
+    def emotion_model(self):
+        if self._emotion_model is _NOT_LOADED:
+            with self._models_lock:
+                if self._emotion_model is _NOT_LOADED:
+                    try:
+                        try:
+                            model = self.deepface.build_model(model_name='Emotion', task='facial_attribute')
+                        except TypeError:
+                            # Older DeepFace releases take only the model name
+                            model = self.deepface.build_model('Emotion')
+                        # Newer releases wrap the Keras model in a client object
+                        self._emotion_model = getattr(model, 'model', model)
+                    except Exception as e:
+                        self._emotion_model = None
+                        print(f"Emotion model not loaded. Falling back to DeepFace.analyze: {e}")
+        return self._emotion_model
+
+    def warm_up(self):
+        """Load every model and run one dummy inference so the first request is fast"""
+        blank = np.zeros((240, 320, 3), dtype=np.uint8)
+        rgb_blank = cv2.cvtColor(blank, cv2.COLOR_BGR2RGB)
+
+        try:
+            with self.trackers.session() as trackers:
+                trackers['face_mesh'].process(rgb_blank)
+            if self.phone_detector:
+                self.phone_detector.detect([blank])
+            if self.deepface:
+                # analyze() builds and caches the emotion model on first call
+                self.deepface.analyze(blank, actions=['emotion'], enforce_detection=False,
+                                      detector_backend='skip', silent=True)
+                if self.emotion_model is not None:
+                    self._analyze_emotion_batch([(blank, [0, 0, 320, 240])])
+        except Exception as e:
+            # A failed warm-up leaves the worker not ready so health checks can catch it
+            print(f"Proctoring warm-up error: {e}")
+            self.warm_up_error = str(e)
+            return self.status()
+
+        self.ready = True
+        self.warm_up_error = None
+        return self.status()
+
+    def status(self):
+        """Readiness and model load state for health checks"""
+        return {
+            'ready': self.ready,
+            'warm_up_error': self.warm_up_error,
+            'models': {
+                'face_tracker_sessions': len(self.trackers),
+                'phone_detector': getattr(self._phone_detector, 'backend', None),
+                'emotion_model': self._emotion_model not in (_NOT_LOADED, None),
+                'deepface': self._deepface not in (_NOT_LOADED, None)
+            },
+            'batching': {
+                'phone': self.phone_batcher.stats(),
+                'emotion': self.emotion_batcher.stats()
+            }
+        }
 
-    def analyze_frame(self, frame):
+    def end_session(self, session_id):
+        """Release the detector schedule and face trackers of a finished session"""
+        self.scheduler.end_session(session_id)
+        self.trackers.close_session(session_id)
+
+    def analyze_frame(self, frame, session_id=None):
         """Analyze a video frame for proctoring violations"""
+        return self.analyze_frames([frame], session_id=session_id)[0]
+
+    def analyze_frames(self, frames, session_id=None):
+        """Analyze a batch of video frames, running phone detection once for the whole batch.
+
+        With a session_id, each detector runs on its own cadence for that
+        session and skipped stages reuse the session's last result.
+        """
+        schedule = self.scheduler.session(session_id) if session_id else None
+
+        with schedule.lock if schedule else nullcontext(), self.trackers.session(session_id) as trackers:
+            staged = []
+            for frame in frames:
+                if schedule:
+                    schedule.begin_frame(frame)
+                analysis, violations = self._analyze_face_stages(frame, trackers, schedule)
+                phone_due = self.phone_detector is not None and self._is_due(schedule, 'phone')
+                emotion_due = analysis['face_detected'] and self._is_due(schedule, 'emotion')
+                staged.append((analysis, violations, phone_due, emotion_due))
+
+            if self.phone_detector:
+                due_frames = [frame for frame, stage in zip(frames, staged) if stage[2]]
+                detections = iter(self._detect_phones(due_frames))
+                for analysis, violations, phone_due, _ in staged:
+                    phone_detected = self._stage_result(
+                        schedule, 'phone', phone_due, lambda: next(detections), False
+                    )
+                    if phone_due:
+                        analysis['stages_run'].append('phone')
+                    self._apply_phone_result(analysis, violations, phone_detected, reused=not phone_due)
+
+            # Every emotion-due frame of the request goes to the emotion batcher in one submit
+            emotions = iter(self._frame_emotions([
+                (frame, analysis.get('face_box'))
+                for frame, (analysis, _, _, emotion_due) in zip(frames, staged) if emotion_due
+            ]))
+            return [
+                self._finalize_analysis(analysis, violations, schedule, emotion_due, lambda: next(emotions))
+                for analysis, violations, _, emotion_due in staged
+            ]
+
+    def analyze_encoded_frames(self, buffers, session_id=None):
+        """analyze_frames for encoded images (JPEG, PNG, WebP), decoded where the models run"""
+        return self.analyze_frames([decode_frame(buffer) for buffer in buffers], session_id=session_id)
+
+    def analyze_encoded_emotion(self, buffer):
+        """analyze_emotion for an encoded image"""
+        return self.analyze_emotion(decode_frame(buffer))
+
+    def summarize_frames(self, analyses):
+        """Merge per-frame analyses into a single summary"""
+        if not analyses:
+            return {
+                'frames_analyzed': 0,
+                'face_visible_percentage': 0,
+                'attention_percentage': 0,
+                'max_face_count': 0,
+                'phone_detected': False,
+                'dominant_emotion': 'neutral',
+                'confidence_level': 70,
+                'integrity_score': 100,
+                'total_violations': 0
+            }
+
+        total = len(analyses)
+        face_frames = sum(1 for a in analyses if a['face_detected'])
+        attentive_frames = sum(1 for a in analyses if a['looking_at_camera'])
+
+        emotion_counts = {}
+        for a in analyses:
+            emotion_counts[a['emotion']] = emotion_counts.get(a['emotion'], 0) + 1
+
+        return {
+            'frames_analyzed': total,
+            'face_visible_percentage': round(face_frames / total * 100, 1),
+            'attention_percentage': round(attentive_frames / total * 100, 1),
+            'max_face_count': max(a['face_count'] for a in analyses),
+            'phone_detected': any(a['phone_detected'] for a in analyses),
+            'dominant_emotion': max(emotion_counts, key=emotion_counts.get),
+            'confidence_level': round(sum(a['confidence_level'] for a in analyses) / total, 1),
+            'integrity_score': round(sum(a['integrity_score'] for a in analyses) / total, 1),
+            'total_violations': sum(len(a['violations']) for a in analyses)
+        }
+
+    def _is_due(self, schedule, stage):
+        """Check whether a detector stage should run on the current frame"""
+        return schedule is None or schedule.is_due(stage)
+
+    def _stage_result(self, schedule, stage, due, detector, default):
+        """Run a due detector and remember its result, or reuse the session's last result"""
+        if due:
+            result = detector()
+            if schedule is not None:
+                schedule.store(stage, result)
+            return result
+        return schedule.last(stage, default)
+
+    def _analyze_face_stages(self, frame, trackers, schedule=None):
+        """Run the face localization stage (presence, count and gaze) on a frame"""
         violations = []
         analysis = {
             'face_detected': False,
@@ -50,24 +279,32 @@ class ProctoringService:
             'phone_detected': False,
             'emotion': 'neutral',
             'confidence_level': 70,
-            'violations': []
+            'violations': [],
+            'stages_run': []
         }
 
         # Convert to RGB for MediaPipe
         rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
 
-        # Face detection
-        face_results = self.face_detection.process(rgb_frame)
+        # Single face-localization pass: the mesh gives face count, gaze and the face box
+        face_due = self._is_due(schedule, 'face')
+        faces = self._stage_result(
+            schedule, 'face', face_due, lambda: self._localize_faces(trackers, rgb_frame, frame.shape),
+            {'face_count': 0, 'faces_looking_away': 0, 'face_box': None}
+        )
+        face_count = faces['face_count']
+
+        analysis['stages_run'] = ['face'] if face_due else []
 
-        if face_results.detections:
+        if face_count:
             analysis['face_detected'] = True
-            analysis['face_count'] = len(face_results.detections)
+            analysis['face_count'] = face_count
 
-            if len(face_results.detections) > 1:
+            if face_count > 1:
                 violations.append({
                     'type': 'multiple_persons',
                     'severity': 'high',
-                    'details': f'Detected {len(face_results.detections)} persons'
+                    'details': f'Detected {face_count} persons'
                 })
         else:
             analysis['face_detected'] = False
@@ -78,79 +315,132 @@ class ProctoringService:
                 'details': 'No face detected in frame'
             })
 
-        # Face mesh for gaze tracking
-        mesh_results = self.face_mesh.process(rgb_frame)
-
-        if mesh_results.multi_face_landmarks:
-            for face_landmarks in mesh_results.multi_face_landmarks:
-                # Check gaze direction
-                gaze_direction = self._calculate_gaze(face_landmarks, frame.shape)
-
-                if gaze_direction == 'away':
-                    analysis['looking_at_camera'] = False
-                    # Only add violation for sustained looking away (reduced severity)
-                    violations.append({
-                        'type': 'looking_away',
-                        'severity': 'low',
-                        'details': 'User may not be looking at the camera'
-                    })
-        else:
-            # If no face mesh detected but face was detected, assume looking at camera
-            if analysis['face_detected']:
-                analysis['looking_at_camera'] = True
-
-        # Phone detection using YOLO
-        if self.yolo_model:
-            phone_detected = self._detect_phone(frame)
-            if phone_detected:
-                analysis['phone_detected'] = True
-                violations.append({
-                    'type': 'phone_detected',
-                    'severity': 'high',
-                    'details': 'Mobile phone detected in frame'
-                })
+        if faces.get('face_box'):
+            analysis['face_box'] = faces['face_box']
+        if faces.get('head_pose'):
+            analysis['head_pose'] = faces['head_pose']
+
+        # One violation per tracked face whose gaze is away from the camera
+        for _ in range(faces['faces_looking_away']):
+            analysis['looking_at_camera'] = False
+            # Only add violation for sustained looking away (reduced severity)
+            violations.append({
+                'type': 'looking_away',
+                'severity': 'low',
+                'details': 'User may not be looking at the camera'
+            })
+
+        if not face_due:
+            self._mark_reused(violations)
+
+        return analysis, violations
+
+    def _localize_faces(self, trackers, rgb_frame, frame_shape):
+        """Run the face mesh once and derive face count, gaze and the main face box"""
+        mesh_results = trackers['face_mesh'].process(rgb_frame)
+
+        if not mesh_results.multi_face_landmarks:
+            return {'face_count': 0, 'faces_looking_away': 0, 'face_box': None}
+
+        # One landmark array per face, shared by every landmark-based metric
+        faces = [
+            self._landmark_array(face_landmarks, frame_shape)
+            for face_landmarks in mesh_results.multi_face_landmarks
+        ]
+        boxes = [self._face_box(points, frame_shape) for points in faces]
+        main_face = max(range(len(faces)), key=lambda i: (boxes[i][2] - boxes[i][0]) * (boxes[i][3] - boxes[i][1]))
+
+        return {
+            'face_count': len(faces),
+            'faces_looking_away': sum(1 for points in faces if self._calculate_gaze(points) == 'away'),
+            'face_box': boxes[main_face],
+            'head_pose': self._calculate_head_pose(faces[main_face])
+        }
 
+    def _face_box(self, points, frame_shape, margin=0.2):
+        """Bounding box [x1, y1, x2, y2] around face landmarks, padded and clipped to the frame"""
+        h, w = frame_shape[:2]
+        x1, y1 = points[:, :2].min(axis=0)
+        x2, y2 = points[:, :2].max(axis=0)
+        pad_x, pad_y = (x2 - x1) * margin, (y2 - y1) * margin
+        return [
+            int(max(0, x1 - pad_x)), int(max(0, y1 - pad_y)),
+            int(min(w, x2 + pad_x)), int(min(h, y2 + pad_y))
+        ]
+
+    def _landmark_array(self, face_landmarks, frame_shape):
+        """Convert face mesh landmarks to an (N, 3) array in pixel units"""
+        h, w = frame_shape[:2]
+        points = np.array(
+            [(lm.x, lm.y, lm.z) for lm in face_landmarks.landmark], dtype=np.float32
+        )
+        # MediaPipe z uses roughly the same scale as x
+        points *= np.array([w, h, w], dtype=np.float32)
+        return points
+
+    def _apply_phone_result(self, analysis, violations, phone_detected, reused=False):
+        """Record a phone detection result on a frame analysis"""
+        if phone_detected:
+            analysis['phone_detected'] = True
+            phone_violation = [{
+                'type': 'phone_detected',
+                'severity': 'high',
+                'details': 'Mobile phone detected in frame'
+            }]
+            if reused:
+                self._mark_reused(phone_violation)
+            violations.extend(phone_violation)
+
+    def _mark_reused(self, violations):
+        """Flag violations that come from a skipped stage's last result, so they are not logged again"""
+        for violation in violations:
+            violation['reused'] = True
+
+    def _finalize_analysis(self, analysis, violations, schedule, emotion_due, detect_emotion):
+        """Attach violations, integrity score and emotion to a frame analysis"""
         analysis['violations'] = violations
         analysis['integrity_score'] = self._calculate_frame_integrity(violations)
 
         # Add emotion analysis if face is detected
         if analysis['face_detected']:
-            try:
-                emotion_data = self.analyze_emotion(frame)
-                analysis['emotion'] = emotion_data.get('dominant_emotion', 'neutral')
-                analysis['confidence_level'] = emotion_data.get('confidence_index', 70)
-            except Exception as e:
-                print(f"Emotion analysis error: {e}")
-                analysis['emotion'] = 'neutral'
-                analysis['confidence_level'] = 70
+            emotion = self._stage_result(
+                schedule, 'emotion', emotion_due, detect_emotion,
+                {'emotion': 'neutral', 'confidence_level': 70}
+            )
+            if emotion_due:
+                analysis['stages_run'].append('emotion')
+            analysis.update(emotion)
 
         return analysis
 
-    def _calculate_gaze(self, face_landmarks, frame_shape):
-        """Calculate gaze direction based on iris position"""
-        h, w = frame_shape[:2]
-
+    def _frame_emotions(self, items):
+        """Dominant emotion and confidence for (frame, face_box) pairs, in one batcher submit"""
         try:
-            # Get iris centers
-            left_iris = np.mean([[face_landmarks.landmark[i].x * w,
-                                  face_landmarks.landmark[i].y * h]
-                                 for i in self.LEFT_IRIS], axis=0)
+            return [
+                {
+                    'emotion': emotion_data.get('dominant_emotion', 'neutral'),
+                    'confidence_level': emotion_data.get('confidence_index', 70)
+                }
+                for emotion_data in self.emotion_batcher.submit(items)
+            ]
+        except Exception as e:
+            print(f"Emotion analysis error: {e}")
+            return [{'emotion': 'neutral', 'confidence_level': 70} for _ in items]
 
-            right_iris = np.mean([[face_landmarks.landmark[i].x * w,
-                                   face_landmarks.landmark[i].y * h]
-                                  for i in self.RIGHT_IRIS], axis=0)
+    def _gaze_ratios(self, points):
+        """Iris position across each eye (0 = first corner, 1 = second) for left and right eyes"""
+        irises = points[self.IRIS_INDICES, :2].mean(axis=1)
+        corners = points[self.EYE_CORNER_INDICES, :2]
 
-            # Get eye corners
-            left_eye_left = np.array([face_landmarks.landmark[self.LEFT_EYE[0]].x * w,
-                                      face_landmarks.landmark[self.LEFT_EYE[0]].y * h])
-            left_eye_right = np.array([face_landmarks.landmark[self.LEFT_EYE[3]].x * w,
-                                       face_landmarks.landmark[self.LEFT_EYE[3]].y * h])
+        eye_widths = np.linalg.norm(corners[:, 1] - corners[:, 0], axis=1)
+        iris_offsets = np.linalg.norm(irises - corners[:, 0], axis=1)
 
-            # Calculate relative position
-            eye_width = np.linalg.norm(left_eye_right - left_eye_left)
-            iris_offset = np.linalg.norm(left_iris - left_eye_left)
+        return np.divide(iris_offsets, eye_widths, out=np.full(2, 0.5), where=eye_widths > 0)
 
-            ratio = iris_offset / eye_width if eye_width > 0 else 0.5
+    def _calculate_gaze(self, points):
+        """Calculate gaze direction based on iris position"""
+        try:
+            ratio = float(self._gaze_ratios(points).mean())
 
             # Determine gaze direction (very lenient thresholds)
             if ratio < 0.15 or ratio > 0.85:
@@ -162,26 +452,42 @@ class ProctoringService:
             # Default to center (looking at camera) on any error
             return 'center'
 
-    def _detect_phone(self, frame):
-        """Detect mobile phone in frame using YOLO"""
-        if not self.yolo_model:
-            return False
-
+    def _calculate_head_pose(self, points):
+        """Approximate head yaw, pitch and roll in degrees from mesh geometry"""
         try:
-            results = self.yolo_model(frame, verbose=False)
+            left_eye, right_eye = points[self.LEFT_EYE[3]], points[self.RIGHT_EYE[0]]
+            forehead, chin = points[self.FOREHEAD], points[self.CHIN]
+
+            eye_vector = left_eye - right_eye
+            face_vector = chin - forehead
+
+            return {
+                'yaw': round(float(np.degrees(np.arctan2(-eye_vector[2], eye_vector[0]))), 1),
+                'pitch': round(float(np.degrees(np.arctan2(face_vector[2], face_vector[1]))), 1),
+                'roll': round(float(np.degrees(np.arctan2(eye_vector[1], eye_vector[0]))), 1)
+            }
+
+        except Exception as e:
+            return {'yaw': 0.0, 'pitch': 0.0, 'roll': 0.0}
 
-            for result in results:
-                for box in result.boxes:
-                    # Class 67 is 'cell phone' in COCO dataset
-                    if int(box.cls) == 67:
-                        confidence = float(box.conf)
-                        if confidence > 0.4:  # Lower threshold for better detection
-                            return True
+    def _detect_phone(self, frame):
+        """Detect mobile phone in frame"""
+        return self._detect_phones([frame])[0]
 
-            return False
+    def _detect_phones(self, frames):
+        """Detect mobile phones in a batch of frames with a single detector call"""
+        if not self.phone_detector or not frames:
+            return [False] * len(frames)
 
+        try:
+            return self.phone_batcher.submit(frames)
         except Exception as e:
-            return False
+            print(f"Phone detection error: {e}")
+            return [False] * len(frames)
+
+    def _run_phone_detector(self, frames):
+        """Batch function for the phone micro-batcher"""
+        return self.phone_detector.detect(frames)
 
     def _calculate_frame_integrity(self, violations):
         """Calculate integrity score for a single frame"""
@@ -193,35 +499,38 @@ class ProctoringService:
 
         return max(0, 100 - total_penalty)
 
-    def analyze_emotion(self, frame):
-        """Analyze facial emotions using DeepFace"""
+    def analyze_emotion(self, frame, face_box=None):
+        """Analyze facial emotions using DeepFace.
+
+        With a face_box from the face mesh, DeepFace gets the cropped face
+        and skips its own face detector.
+        """
         try:
-            from deepface import DeepFace
+            DeepFace = self.deepface
+            if DeepFace is None:
+                raise RuntimeError('DeepFace is not available')
+
+            if face_box:
+                x1, y1, x2, y2 = face_box
+                image, detector_backend = frame[y1:y2, x1:x2], 'skip'
+            else:
+                image, detector_backend = frame, 'opencv'
+
             result = DeepFace.analyze(
-                frame,
+                image,
                 actions=['emotion'],
                 enforce_detection=False,
-                detector_backend='opencv'
+                detector_backend=detector_backend
             )
 
             if isinstance(result, list):
                 result = result[0]
 
-            emotions = result.get('emotion', {})
-            dominant = result.get('dominant_emotion', 'neutral')
-            dominant_confidence = emotions.get(dominant, 70)
-
-            print(f"Emotion detected: {dominant} ({dominant_confidence:.1f}%)")
-
-            stress_emotions = ['fear', 'angry', 'sad']
-            stress_level = sum(emotions.get(e, 0) for e in stress_emotions)
-
-            return {
-                'emotions': emotions,
-                'dominant_emotion': dominant,
-                'stress_level': min(100, stress_level),
-                'confidence_index': round(dominant_confidence, 1)
-            }
+            emotion_data = self._emotion_result(
+                result.get('emotion', {}), result.get('dominant_emotion', 'neutral')
+            )
+            print(f"Emotion detected: {emotion_data['dominant_emotion']} ({emotion_data['confidence_index']:.1f}%)")
+            return emotion_data
 
         except Exception as e:
             print(f"Emotion analysis failed: {e}")
@@ -232,50 +541,81 @@ class ProctoringService:
                 'confidence_index': 70
             }
 
-    def analyze_voice_stress(self, audio_file):
+    def _emotion_result(self, emotions, dominant):
+        """Shape emotion probabilities (percentages) into an emotion analysis"""
+        dominant_confidence = emotions.get(dominant, 70)
+
+        stress_emotions = ['fear', 'angry', 'sad']
+        stress_level = sum(emotions.get(e, 0) for e in stress_emotions)
+
+        return {
+            'emotions': emotions,
+            'dominant_emotion': dominant,
+            'stress_level': min(100, stress_level),
+            'confidence_index': round(dominant_confidence, 1)
+        }
+
+    def _analyze_emotion_batch(self, items):
+        """Batch function for the emotion micro-batcher; items are (frame, face_box) pairs"""
+        results = [None] * len(items)
+        cropped = [i for i, (_, face_box) in enumerate(items) if face_box]
+
+        model = self.emotion_model if cropped else None
+        if model is not None:
+            try:
+                # Same preprocessing as DeepFace: 48x48 grayscale scaled to [0, 1]
+                faces = np.stack([self._emotion_input(*items[i]) for i in cropped])
+                predictions = model.predict(faces, verbose=0)
+                for i, probabilities in zip(cropped, predictions):
+                    emotions = {label: float(p) * 100 for label, p in zip(EMOTION_LABELS, probabilities)}
+                    results[i] = self._emotion_result(emotions, max(emotions, key=emotions.get))
+            except Exception as e:
+                print(f"Batched emotion analysis failed: {e}")
+
+        # Frames without a face box, or a failed batch, go through DeepFace one by one
+        return [
+            result if result is not None else self.analyze_emotion(frame, face_box)
+            for result, (frame, face_box) in zip(results, items)
+        ]
+
+    def _emotion_input(self, frame, face_box):
+        """Crop, grayscale and resize a face for the emotion model"""
+        x1, y1, x2, y2 = face_box
+        face = frame[y1:y2, x1:x2]
+        if face.size == 0:
+            face = frame
+        gray = cv2.cvtColor(face, cv2.COLOR_BGR2GRAY)
+        return (cv2.resize(gray, (48, 48)).astype(np.float32) / 255.0)[..., np.newaxis]
+
+    def analyze_voice_stress(self, audio):
         """Analyze voice for stress indicators"""
         try:
-            # Save to temp file
-            with tempfile.NamedTemporaryFile(suffix='.wav', delete=False) as temp:
-                audio_file.save(temp.name)
-                temp_path = temp.name
-
-            # Load audio
-            y, sr = librosa.load(temp_path, sr=None)
+            features = self._audio_features(audio)
 
             # Extract features
             # Pitch variation (high variation = stress)
-            pitches, magnitudes = librosa.piptrack(y=y, sr=sr)
-            pitch_values = []
-            for t in range(pitches.shape[1]):
-                index = magnitudes[:, t].argmax()
-                pitch = pitches[index, t]
-                if pitch > 0:
-                    pitch_values.append(pitch)
-
-            pitch_std = np.std(pitch_values) if pitch_values else 0
-
-            # Speaking rate (words per minute estimation)
-            tempo, _ = librosa.beat.beat_track(y=y, sr=sr)
+            pitch_std = np.std(features.pitch) if features.pitch.size else 0
 
             # Energy variation
-            rms = librosa.feature.rms(y=y)[0]
-            energy_std = np.std(rms)
+            energy_std = np.std(features.rms)
+
+            # Speaking rate from the same energy envelope
+            syllable_rate = self._syllable_rate(features.rms, features.hop_length / features.sr)
 
             # Normalize to scores
             stress_level = min(100, pitch_std / 50 * 100)
             tone_stability = max(0, 100 - energy_std * 1000)
 
-            # Confidence based on consistent tempo
-            confidence = min(100, tempo / 2) if tempo < 200 else 50
-
-            os.unlink(temp_path)
+            # Confidence based on a steady, unhurried pace
+            slow, fast = NORMAL_SYLLABLE_RATE
+            confidence = min(100, syllable_rate / fast * 90) if syllable_rate < fast else 50
 
             return {
-                'stress_level': round(stress_level, 2),
-                'confidence_index': round(confidence, 2),
-                'tone_stability': round(tone_stability, 2),
-                'speaking_pace': 'normal' if 100 < tempo < 180 else ('fast' if tempo >= 180 else 'slow')
+                'stress_level': round(float(stress_level), 2),
+                'confidence_index': round(float(confidence), 2),
+                'tone_stability': round(float(tone_stability), 2),
+                'speaking_rate': round(float(syllable_rate), 2),
+                'speaking_pace': 'normal' if slow < syllable_rate < fast else ('fast' if syllable_rate >= fast else 'slow')
             }
 
         except Exception as e:
@@ -287,23 +627,60 @@ class ProctoringService:
                 'error': str(e)
             }
 
-    def analyze_audio(self, audio_file):
+    def _audio_features(self, audio):
+        """Shared features of an AudioClip or uploaded file"""
+        if not isinstance(audio, AudioClip):
+            audio = audio_clips.ingest(audio)
+        return audio.features
+
+    def _syllable_rate(self, envelope, hop_seconds):
+        """Estimate syllables per second of speech from peaks in an RMS energy envelope"""
+        if envelope.size < 3:
+            return 0.0
+
+        # Smooth over ~50 ms so each syllable nucleus gives a single peak
+        width = max(1, round(0.05 / hop_seconds))
+        smooth = np.convolve(envelope, np.ones(width) / width, mode='same')
+
+        floor = np.percentile(smooth, 10)
+        dynamic_range = smooth.max() - floor
+        if dynamic_range <= 0:
+            return 0.0
+
+        # Speaking time counts 250 ms blocks with any sound above the silence level, so
+        # pauses are left out but the dips between syllables are not
+        voiced = smooth > floor + 0.1 * dynamic_range
+        block = max(1, round(0.25 / hop_seconds))
+        voiced = np.pad(voiced, (0, -len(voiced) % block)).reshape(-1, block)
+        speech_seconds = np.count_nonzero(voiced.any(axis=1)) * block * hop_seconds
+        if speech_seconds < 0.2:
+            return 0.0
+
+        # Syllable nuclei are energy peaks well above the silence level
+        middle = smooth[1:-1]
+        is_peak = (middle > smooth[:-2]) & (middle >= smooth[2:]) & (middle > floor + 0.3 * dynamic_range)
+        peaks = np.flatnonzero(is_peak) + 1
+
+        # Syllables are at least ~100 ms apart
+        min_gap = round(0.1 / hop_seconds)
+        count, last = 0, -min_gap
+        for index in peaks:
+            if index - last >= min_gap:
+                count += 1
+                last = index
+
+        return count / speech_seconds
+
+    def analyze_audio(self, audio):
         """Analyze audio for background noise"""
         try:
-            with tempfile.NamedTemporaryFile(suffix='.wav', delete=False) as temp:
-                audio_file.save(temp.name)
-                temp_path = temp.name
-
-            y, sr = librosa.load(temp_path, sr=None)
+            features = self._audio_features(audio)
 
             # Calculate signal-to-noise ratio (simplified)
-            rms = librosa.feature.rms(y=y)[0]
-            mean_rms = np.mean(rms)
+            mean_rms = np.mean(features.rms)
 
             # Spectral flatness (high = noise-like)
-            flatness = np.mean(librosa.feature.spectral_flatness(y=y))
-
-            os.unlink(temp_path)
+            flatness = np.mean(features.flatness)
 
             noise_level = flatness * 100
             is_noisy = noise_level > 30
@@ -0,0 +1,152 @@
+import os
+import queue
+import socket
+import threading
+import uuid
+from datetime import datetime, timedelta
+
+from pymongo.errors import DuplicateKeyError
+
+from services.background import BackgroundThread, after_fork_in_child
+
+
+class QuestionPool:
+    """Pre-generated interview question sets in MongoDB, refilled in the background.
+
+    Each document is one ready-to-serve set for a (round_type, company,
+    topic) key. Taking a set removes it, and a single background thread
+    generates replacements whenever a key drops below the low-water mark,
+    one LLM call at a time. A lease document per key makes sure only one
+    process refills a key at a time. Only the (round_type, company, topic)
+    combinations passed as keys are pooled.
+    """
+
+    def __init__(self, generate, keys, set_size=5, low_water=None, target=None):
+        self.generate = generate  # (round_type, company, topic, count) -> list of questions
+        self.keys = [tuple(key) for key in keys]
+        self._pooled = set(self.keys)
+        self.set_size = set_size
+        self.low_water = low_water or int(os.getenv('QUESTION_POOL_LOW_WATER', 2))
+        self.target = max(self.low_water, target or int(os.getenv('QUESTION_POOL_TARGET', 3)))
+        self.lease_seconds = int(os.getenv('QUESTION_POOL_LEASE_SECONDS', 300))
+        self.collection = None
+        self.leases = None
+        self._owner = f'{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex}'
+
+        self._queue = queue.Queue()
+        self._pending = set()
+        self._lock = threading.Lock()
+        self._worker = BackgroundThread(self._run, 'question-pool')
+        self._index_ready = False
+        after_fork_in_child(self._reset_after_fork)
+
+    def attach(self, collection):
+        """Store question sets in a MongoDB collection, with refill leases in its 'leases' sub-collection"""
+        self.collection = collection
+        self.leases = collection['leases']
+        self._index_ready = False
+
+    def take(self, round_type, company, topic='', count=5):
+        """Remove and return a question set for the key, or None if the pool has none"""
+        # Unpooled keys are generated on the spot, so client input can't add pool keys or refills
+        if self.collection is None or count != self.set_size or (round_type, company, topic or '') not in self._pooled:
+            return None
+
+        key = self._key(round_type, company, topic)
+        try:
+            document = self.collection.find_one_and_delete(
+                key, sort=[('created_at', 1)], projection={'questions': 1}
+            )
+        except Exception as e:
+            print(f"Question pool read error: {e}")
+            return None
+
+        self.schedule_refill(key)
+        return document['questions'] if document else None
+
+    def prewarm(self):
+        """Queue a refill for every pooled key"""
+        for combination in self.keys:
+            self.schedule_refill(self._key(*combination))
+
+    def schedule_refill(self, key):
+        """Queue a background top-up of a key unless one is already pending"""
+        if self.collection is None:
+            return
+        pending_key = tuple(sorted(key.items()))
+        with self._lock:
+            if pending_key in self._pending:
+                return
+            self._pending.add(pending_key)
+        self._queue.put(key)
+        self._worker.ensure_started()
+
+    def _reset_after_fork(self):
+        # A key the parent was refilling at fork time would otherwise stay pending here forever;
+        # the child starts clean and refills keys again as /start takes sets
+        self._queue = queue.Queue()
+        self._pending = set()
+        self._lock = threading.Lock()
+
+    def _key(self, round_type, company, topic=''):
+        # Question sets don't depend on the interviewer persona, so every persona shares them
+        return {'round_type': round_type, 'company': company, 'topic': topic or ''}
+
+    def _run(self):
+        while True:
+            key = self._queue.get()
+            try:
+                self._refill(key)
+            except Exception as e:
+                print(f"Question pool refill error for {key}: {e}")
+            finally:
+                with self._lock:
+                    self._pending.discard(tuple(sorted(key.items())))
+
+    def _refill(self, key):
+        self._ensure_index()
+        # Every worker queues refills; the lease holder is the only one that counts and generates
+        lease_id = '|'.join(key[field] for field in ('round_type', 'company', 'topic'))
+        if not self._acquire_lease(lease_id):
+            return
+
+        try:
+            available = self.collection.count_documents(key)
+            if available >= self.low_water:
+                return
+
+            # Bounded so a model that keeps returning short sets can't loop forever
+            for _ in range(2 * (self.target - available)):
+                if available >= self.target:
+                    break
+                # Extend the lease across slow LLM calls; stop if it expired and another process took it
+                if not self._acquire_lease(lease_id):
+                    return
+                questions = self.generate(key['round_type'], key['company'], key['topic'], self.set_size)
+                if len(questions) < self.set_size:
+                    continue
+                self.collection.insert_one({**key, 'questions': questions, 'created_at': datetime.utcnow()})
+                available += 1
+        finally:
+            self.leases.delete_one({'_id': lease_id, 'owner': self._owner})
+
+    def _acquire_lease(self, lease_id):
+        """Take or extend the refill lease for a key; False while another process holds it"""
+        now = datetime.utcnow()
+        try:
+            self.leases.update_one(
+                {'_id': lease_id, '$or': [{'owner': self._owner}, {'expires_at': {'$lt': now}}]},
+                {'$set': {'owner': self._owner, 'expires_at': now + timedelta(seconds=self.lease_seconds)}},
+                upsert=True
+            )
+            return True
+        except DuplicateKeyError:
+            # The lease exists and belongs to another live process
+            return False
+
+    def _ensure_index(self):
+        if not self._index_ready:
+            self.collection.create_index([
+                ('round_type', 1), ('company', 1), ('topic', 1), ('created_at', 1)
+            ])
+            self._index_ready = True
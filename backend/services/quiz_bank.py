@@ -0,0 +1,130 @@
+import hashlib
+import os
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from pymongo.errors import BulkWriteError
+
+from services.content_store import ContentStore
+
+# Questions requested from the LLM per top-up call
+QUIZ_BANK_BATCH_SIZE = int(os.getenv('QUIZ_BANK_BATCH_SIZE', 20))
+# Bank size per (subject, topic, difficulty) that background top-ups grow towards
+QUIZ_BANK_TARGET_SIZE = int(os.getenv('QUIZ_BANK_TARGET_SIZE', 100))
+
+# One background top-up at a time per worker, at most one queued per bank
+_top_up_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='quiz-bank')
+_pending_top_ups = set()
+_pending_lock = threading.Lock()
+
+
+def normalize_text(text):
+    """Lowercase text with numbering, punctuation and extra whitespace removed"""
+    text = re.sub(r'^\s*(q(uestion)?\s*)?\d*[.:)]\s*', '', text.lower())
+    text = re.sub(r'[^\w\s]', ' ', text)
+    return ' '.join(text.split())
+
+
+def question_hash(question_text):
+    """Hash that near-duplicate questions share"""
+    return hashlib.sha1(normalize_text(question_text).encode()).hexdigest()
+
+
+class QuizItemBank(ContentStore):
+    """Parsed MCQs accumulated per (subject, topic, difficulty) for quizzes to sample from.
+
+    A unique index on the normalized question hash drops near-duplicates
+    on insert, and the same index serves the $sample query that assembles
+    a quiz.
+    """
+
+    index = ContentStore.index + [('text_hash', 1)]
+    index_options = {'unique': True}
+
+    def sample(self, subject, topic, difficulty, count):
+        """Return up to count random questions from the bank, numbered for a new quiz"""
+        items = self.collection.aggregate([
+            {'$match': self._key(subject, topic, difficulty)},
+            {'$sample': {'size': count}}
+        ])
+
+        questions = []
+        for question_id, item in enumerate(items):
+            questions.append({
+                'question_id': question_id,
+                'item_id': str(item['_id']),
+                'question_text': item['question_text'],
+                'options': item['options'],
+                'correct_answer': item['correct_answer'],
+                'explanation': item.get('explanation', ''),
+                'user_answer': None,
+                'is_correct': None
+            })
+        return questions
+
+    def add(self, subject, topic, difficulty, questions):
+        """Store parsed questions, skipping near-duplicates; returns how many were new"""
+        key = self._key(subject, topic, difficulty)
+        now = datetime.utcnow()
+        items = {}
+        for q in questions:
+            items.setdefault(question_hash(q['question_text']), {
+                **key,
+                'topic': topic,
+                'text_hash': question_hash(q['question_text']),
+                'question_text': q['question_text'],
+                'options': q['options'],
+                'correct_answer': q['correct_answer'],
+                'explanation': q.get('explanation', ''),
+                'created_at': now
+            })
+        if not items:
+            return 0
+
+        try:
+            return len(self.collection.insert_many(list(items.values()), ordered=False).inserted_ids)
+        except BulkWriteError as e:
+            # Duplicate-key errors are the near-duplicates already in the bank
+            if any(error.get('code') != 11000 for error in e.details.get('writeErrors', [])):
+                raise
+            return e.details.get('nInserted', 0)
+
+    def size(self, subject, topic, difficulty):
+        return self.collection.count_documents(self._key(subject, topic, difficulty))
+
+    def sample_texts(self, subject, topic, difficulty, limit=15):
+        """A few existing question texts, for asking the LLM not to repeat them"""
+        items = self.collection.aggregate([
+            {'$match': self._key(subject, topic, difficulty)},
+            {'$sample': {'size': limit}},
+            {'$project': {'question_text': 1}}
+        ])
+        return [item['question_text'] for item in items]
+
+    def top_up(self, subject, topic, difficulty, generate, count=QUIZ_BANK_BATCH_SIZE):
+        """Generate count questions with generate(subject, topic, difficulty, count, avoid) and bank them"""
+        avoid = self.sample_texts(subject, topic, difficulty)
+        questions = generate(subject, topic, difficulty, count, avoid)
+        return self.add(subject, topic, difficulty, questions)
+
+    def top_up_in_background(self, subject, topic, difficulty, generate):
+        """Grow a bank below QUIZ_BANK_TARGET_SIZE without blocking the request"""
+        pending_key = (subject, self._topic_key(topic), difficulty)
+        with _pending_lock:
+            if pending_key in _pending_top_ups:
+                return
+            _pending_top_ups.add(pending_key)
+
+        def run():
+            try:
+                if self.size(subject, topic, difficulty) < QUIZ_BANK_TARGET_SIZE:
+                    self.top_up(subject, topic, difficulty, generate)
+            except Exception as e:
+                print(f"Quiz bank top-up error for {pending_key}: {e}")
+            finally:
+                with _pending_lock:
+                    _pending_top_ups.discard(pending_key)
+
+        _top_up_executor.submit(run)
@@ -0,0 +1,101 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+
+
+class _PooledTrackers:
+    def __init__(self, trackers):
+        self.trackers = trackers
+        self.lock = threading.Lock()
+        self.last_used = time.monotonic()
+        self.users = 0
+
+
+class TrackerPool:
+    """Per-session MediaPipe trackers with LRU eviction and idle expiry.
+
+    MediaPipe graphs keep tracking state between frames and are not thread
+    safe, so each interview session (or each thread, for requests without a
+    session) gets its own set of trackers.
+    """
+
+    def __init__(self, factory, max_size=None, idle_timeout_seconds=None):
+        self.factory = factory
+        self.max_size = max_size or int(os.getenv('PROCTORING_TRACKER_POOL_SIZE', 64))
+        self.idle_timeout_seconds = idle_timeout_seconds or float(
+            os.getenv('PROCTORING_TRACKER_IDLE_SECONDS', 300)
+        )
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def session(self, session_id=None):
+        """Borrow the trackers for a session, creating them on first use"""
+        key = session_id or f'thread-{threading.get_ident()}'
+        entry = self._checkout(key)
+        try:
+            with entry.lock:
+                yield entry.trackers
+        finally:
+            with self._lock:
+                entry.users -= 1
+                entry.last_used = time.monotonic()
+
+    def close_session(self, session_id):
+        """Release the trackers of a finished session"""
+        with self._lock:
+            entry = self._entries.get(session_id)
+            if entry is None or entry.users:
+                return
+            del self._entries[session_id]
+        self._close(entry)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _checkout(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                entry.users += 1
+                self._entries.move_to_end(key)
+                return entry
+
+        # Build graphs outside the pool lock; they take a while to initialize
+        created = _PooledTrackers(self.factory())
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                entry = self._entries[key] = created
+                created = None
+            entry.users += 1
+            self._entries.move_to_end(key)
+            evicted = self._collect_evictions()
+
+        if created is not None:
+            self._close(created)
+        for stale in evicted:
+            self._close(stale)
+        return entry
+
+    def _collect_evictions(self):
+        now = time.monotonic()
+        evicted = []
+        for key in list(self._entries):
+            entry = self._entries[key]
+            if entry.users:
+                continue
+            # Oldest first: drop idle entries, then enough LRU entries to fit max_size
+            if now - entry.last_used > self.idle_timeout_seconds or len(self._entries) > self.max_size:
+                evicted.append(self._entries.pop(key))
+        return evicted
+
+    def _close(self, entry):
+        for tracker in entry.trackers.values():
+            try:
+                tracker.close()
+            except Exception as e:
+                print(f"Tracker close error: {e}")
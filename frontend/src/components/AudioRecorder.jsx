@@ -51,7 +51,8 @@ const AudioRecorder = ({ onTranscription, onRecordingChange }) => {
         formData.append('audio', blob, 'recording.wav')
 
         const response = await interviewApi.transcribe(formData)
-        onTranscription?.(response.data.transcription)
+        // audio_id lets voice and noise analysis reuse this upload
+        onTranscription?.(response.data.transcription, response.data.audio_id)
       } catch (error) {
         console.error('Transcription error:', error)
         onTranscription?.('')
@@ -42,6 +42,9 @@ export const interviewApi = {
     headers: { 'Content-Type': 'multipart/form-data' }
   }),
   evaluate: (data) => api.post('/interview/evaluate', data),
+  submitAnswer: (formData) => api.post('/interview/answer', formData, {
+    headers: { 'Content-Type': 'multipart/form-data' }
+  }),
   complete: (data) => api.post('/interview/complete', data),
   getHistory: () => api.get('/interview/history'),
   getDetail: (id) => api.get(`/interview/${id}`),
@@ -62,22 +65,73 @@ export const flashcardApi = {
 // Quiz API
 export const quizApi = {
   generate: (data) => api.post('/quiz/generate', data),
+  // Streams the quiz as Server-Sent Events, calling onEvent(type, data) per question and at the end
+  generateStream: async (data, onEvent) => {
+    const response = await fetch(`${api.defaults.baseURL}/quiz/generate/stream`, {
+      method: 'POST',
+      headers: {
+        'Content-Type': 'application/json',
+        Authorization: `Bearer ${localStorage.getItem('token')}`
+      },
+      body: JSON.stringify(data)
+    })
+    if (!response.ok) {
+      const body = await response.json().catch(() => ({}))
+      throw new Error(body.error || `Quiz generation failed (${response.status})`)
+    }
+
+    const reader = response.body.getReader()
+    const decoder = new TextDecoder()
+    let buffer = ''
+    for (;;) {
+      const { done, value } = await reader.read()
+      if (done) break
+      buffer += decoder.decode(value, { stream: true })
+      const messages = buffer.split('\n\n')
+      buffer = messages.pop()
+      for (const message of messages) {
+        const type = message.match(/^event: (.*)$/m)?.[1]
+        const payload = message.match(/^data: (.*)$/m)?.[1]
+        if (type && payload) onEvent(type, JSON.parse(payload))
+      }
+    }
+  },
   submit: (data) => api.post('/quiz/submit', data),
   getHistory: () => api.get('/quiz/history'),
   getDetail: (id) => api.get(`/quiz/${id}`),
   getAnalytics: () => api.get('/quiz/analytics')
 }
 
+// Analyze an already uploaded clip by audio_id; if it has expired (404), upload formData instead
+const postAudioClip = async (url, audioId, formData) => {
+  try {
+    return await api.post(url, { audio_id: audioId })
+  } catch (error) {
+    if (error.response?.status !== 404 || !formData) throw error
+    return api.post(url, formData, { headers: { 'Content-Type': 'multipart/form-data' } })
+  }
+}
+
 // Proctoring API
 export const proctoringApi = {
   analyzeFrame: (data) => api.post('/proctoring/analyze-frame', data),
+  analyzeFrameBinary: (blob, interviewId) => api.post('/proctoring/analyze-frame', blob, {
+    headers: { 'Content-Type': 'image/jpeg' },
+    params: { interview_id: interviewId }
+  }),
+  analyzeFrames: (data) => api.post('/proctoring/analyze-frames', data),
   analyzeAudio: (formData) => api.post('/proctoring/analyze-audio', formData, {
     headers: { 'Content-Type': 'multipart/form-data' }
   }),
+  analyzeAudioClip: (audioId, formData) => postAudioClip('/proctoring/analyze-audio', audioId, formData),
   analyzeEmotion: (data) => api.post('/proctoring/emotion', data),
+  analyzeEmotionBinary: (blob) => api.post('/proctoring/emotion', blob, {
+    headers: { 'Content-Type': 'image/jpeg' }
+  }),
   analyzeVoice: (formData) => api.post('/proctoring/voice-analysis', formData, {
     headers: { 'Content-Type': 'multipart/form-data' }
   }),
+  analyzeVoiceClip: (audioId, formData) => postAudioClip('/proctoring/voice-analysis', audioId, formData),
   getLog: (interviewId) => api.get(`/proctoring/log/${interviewId}`),
   getIntegrityScore: (interviewId) => api.get(`/proctoring/integrity-score/${interviewId}`),
   getTimeline: (interviewId) => api.get(`/proctoring/timeline/${interviewId}`)